@@ -0,0 +1,322 @@
+# benchmark.py
+"""Headless benchmarks for the UI hot paths (SDL dummy video driver).
+
+    python benchmark.py [--sizes 100,1000,10000] [--output run.json]
+    python benchmark.py --compare base.json run.json [--threshold 10]
+
+Each workload records per-operation latencies in milliseconds; the output is
+JSON with count/mean/p50/p90/p99/max per operation. --compare exits with
+status 1 when p50 or p99 of any operation regressed more than --threshold %.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, FONT_SIZE
+from chat_window import ChatWindow
+from input_box import InputBox
+from clipboard import Clipboard
+from fonts import get_font
+from gui_regions import GUIRegions
+from renderer import Renderer, RENDER_MODES
+
+DEFAULT_SIZES = (100, 1000, 10000)
+WORDS = ("idle", "fox", "loot", "level", "gold", "xp", "Informações", "upgrade",
+         "generator", "ok", "N/D", "a", "supercalifragilistic", "🦊")
+
+class Recorder:
+    """Collects latency samples (ms) per operation name."""
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextmanager
+    def time(self, name):
+        t0 = time.perf_counter()
+        yield
+        self.samples.setdefault(name, []).append((time.perf_counter() - t0) * 1000.0)
+
+    def summary(self):
+        return {name: summarize(values) for name, values in self.samples.items()}
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(q / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+def summarize(values):
+    s = sorted(values)
+    return {
+        "count": len(s),
+        "mean_ms": sum(s) / len(s) if s else 0.0,
+        "p50_ms": percentile(s, 50),
+        "p90_ms": percentile(s, 90),
+        "p99_ms": percentile(s, 99),
+        "max_ms": s[-1] if s else 0.0,
+    }
+
+def random_text(rng, min_words=1, max_words=40):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+def key_event(key=0, unicode="", mod=0):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=mod, scancode=0)
+
+class ScriptedBackend:
+    """Clipboard backend that serves a fixed text inline (no system clipboard)."""
+
+    threaded = False
+
+    def __init__(self, text):
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+    def copy(self, text):
+        self.text = text
+
+@contextmanager
+def scripted_clipboard(box, text):
+    """Serve `text` to Ctrl+V in `box` without touching the system clipboard."""
+    original = box.clipboard
+    box.clipboard = Clipboard(ScriptedBackend(text))
+    try:
+        yield
+    finally:
+        box.clipboard = original
+
+def timed_paste(rec, box, blob, name):
+    """Ctrl+V of `blob` until its last chunk is inserted, and each paste frame."""
+    with scripted_clipboard(box, blob):
+        with rec.time(f"input_box.{name}"):
+            box.process_event(key_event(pygame.K_v, "\x16", pygame.KMOD_CTRL))
+            while True:
+                with rec.time(f"input_box.{name.replace('[', '_frame[', 1)}"):
+                    box.update(0.0)
+                if not box._paste_pending():
+                    break
+
+def filled_chat(screen, font, size, rng):
+    chat = ChatWindow(screen)
+    for i in range(size):
+        chat.add_message("user" if i % 2 else "bot", random_text(rng))
+    chat.draw(font, 'chat')  # fixa a fonte da quebra de linha
+    return chat
+
+def bench_add_message(rec, screen, font, size, rng, ops=300):
+    chat = filled_chat(screen, font, size, rng)
+    for _ in range(ops):
+        text = random_text(rng)
+        with rec.time(f"chat_window.add_message[n={size}]"):
+            chat.add_message("bot", text)
+    chat.close()
+
+def bench_ingest(rec, screen, font, size, rng, burst=10000):
+    """A burst of queued messages drained frame by frame (update + draw)."""
+    chat = filled_chat(screen, font, size, rng)
+    with rec.time(f"chat_window.add_messages[{burst // 10}]"):
+        chat.add_messages(("bot", random_text(rng)) for _ in range(burst // 10))
+    for _ in range(burst):
+        chat.post_message("bot", random_text(rng))
+    while chat.backlog():
+        with rec.time(f"chat_window.ingest_frame[n={size}]"):
+            chat.update(1.0 / 60)
+            chat.draw(font, 'chat')
+    chat.close()
+
+def bench_panel_draw(rec, screen, font, size, rng, ops=200):
+    chat = filled_chat(screen, font, size, rng)
+    panel = chat.panel
+    for _ in range(ops):
+        chat._wrap_visible(font)
+        with rec.time(f"scrollable_panel.draw.idle[n={size}]"):
+            panel.draw(font, screen)
+    for _ in range(ops):
+        panel.process_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=rng.choice((-3, -1, 1, 3))))
+        panel.update(0.25)  # quase toda a inércia de uma vez
+        chat._wrap_visible(font)
+        with rec.time(f"scrollable_panel.draw.scroll[n={size}]"):
+            panel.draw(font, screen)
+    for _ in range(ops // 2):
+        panel.scroll = rng.randrange(max(1, len(panel.lines)))
+        panel._ensure_scroll_bounds()
+        with rec.time(f"chat_window.draw.jump[n={size}]"):
+            chat.draw(font, 'chat')
+    for _ in range(ops // 10):
+        # um giro da roda e os quadros da inércia até parar
+        panel.process_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=rng.choice((-1, 1))))
+        while panel.is_animating():
+            with rec.time(f"chat_window.momentum_frame[n={size}]"):
+                chat.update(1.0 / 60)
+                chat.draw(font, 'chat')
+    # arrasto de seleção em diagonal pelo chat (hit-test + destaque + desenho)
+    rect = panel.rect
+    chat.process_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=rect.topleft))
+    for k in range(ops):
+        pos = (rect.x + k * rect.width // ops, rect.y + k * rect.height // ops)
+        with rec.time(f"chat_window.select_drag[n={size}]"):
+            chat.process_event(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(1, 0, 0)))
+            chat.draw(font, 'chat')
+    chat.process_event(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=rect.bottomright))
+    chat.close()
+
+def bench_input(rec, screen, rng):
+    chat = ChatWindow(screen)
+    box = InputBox(screen, chat)
+    for _ in range(2000):
+        ch = rng.choice("abcdefghij klmnop ")
+        with rec.time("input_box.type"):
+            box.process_event(key_event(unicode=ch))
+    for _ in range(500):
+        with rec.time("input_box.backspace"):
+            box.process_event(key_event(pygame.K_BACKSPACE))
+    for kb in (1, 10, 100):
+        blob = "\n".join(random_text(rng, 5, 60) for _ in range(kb * 4))[:kb * 1024]
+        for _ in range(5):
+            box._take_text()
+            timed_paste(rec, box, blob, f"paste[{kb}KB]")
+            for _ in range(3):
+                with rec.time(f"input_box._reflow_all[{kb}KB]"):
+                    box._reflow_all()
+            # largura nova: a tela agora, o resto em fatias por quadro
+            for size in ((WINDOW_WIDTH - 200, WINDOW_HEIGHT), (WINDOW_WIDTH, WINDOW_HEIGHT)):
+                with rec.time(f"input_box.resize[{kb}KB]"):
+                    box.layout.resize(size)
+                while box.next_timer() == 0.0:
+                    with rec.time(f"input_box.resize_frame[{kb}KB]"):
+                        box.update(1.0 / 60)
+    for kb in (1, 10, 100):
+        # sem quebras de linha: todos os pedaços caem no mesmo parágrafo
+        blob = " ".join(random_text(rng, 60, 60) for _ in range(kb * 4))[:kb * 1024]
+        for _ in range(3):
+            box._take_text()
+            timed_paste(rec, box, blob, f"paste_paragraph[{kb}KB]")
+            box._set_cursor_offset(len(blob) // 2)
+            for _ in range(50):
+                ch = rng.choice("abcdefghij klmnop ")
+                with rec.time(f"input_box.type_in_paragraph[{kb}KB]"):
+                    box.process_event(key_event(unicode=ch))
+                # linhas que a tecla deixou provisórias, re-quebradas por quadro
+                with rec.time(f"input_box.update_in_paragraph[{kb}KB]"):
+                    box.update(1.0 / 60)
+    box._take_text()
+    chat.close()
+
+def bench_frames(rec, screen, font, size, mode, rng, frames=300):
+    """Main-loop frames (events + update + render) with a scripted input mix."""
+    chat = filled_chat(screen, font, size, rng)
+    box = InputBox(screen, chat)
+    regions = GUIRegions(screen, chat, box)
+    renderer = Renderer(screen, font, chat, box, regions, mode)
+    renderer.render('input')
+    for f in range(frames):
+        r = rng.random()
+        if r < 0.4:
+            events = [key_event(unicode=rng.choice("abc def "))]
+        elif r < 0.5:
+            events = [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=rng.choice((-1, 1)))]
+        elif r < 0.52:
+            events = [key_event(pygame.K_RETURN, "\r", pygame.KMOD_SHIFT)]
+        else:
+            events = []  # quadro ocioso
+        with rec.time(f"frame[{mode},n={size}]"):
+            for event in events:
+                if event.type == pygame.MOUSEWHEEL:
+                    chat.panel.process_event(event)
+                    chat.mark_dirty(chat.get_chat_area_rect())
+                sent = box.process_event(event)
+                if sent:
+                    chat.add_message("user", sent)
+                    chat.add_message("bot", "N/D")
+            box.update(1.0 / 60)
+            chat.update(1.0 / 60)
+            renderer.render('input')
+    chat.close()
+
+def run(sizes, seed=1):
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    font = get_font(FONT_SIZE)
+    rng = random.Random(seed)
+    rec = Recorder()
+    for size in sizes:
+        bench_add_message(rec, screen, font, size, rng)
+        bench_panel_draw(rec, screen, font, size, rng)
+        bench_ingest(rec, screen, font, size, rng)
+        for mode in RENDER_MODES:
+            bench_frames(rec, screen, font, size, mode, rng)
+    bench_input(rec, screen, rng)
+    pygame.quit()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "seed": seed,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": rec.summary(),
+    }
+
+def compare(base, new, threshold, min_ms=0.05):
+    """Print p50/p99 changes per operation; return the names that regressed."""
+    regressions = []
+    print(f"{'operation':48} {'p50 base':>9} {'p50 new':>9} {'p99 base':>9} {'p99 new':>9}  change")
+    for name in sorted(set(base["results"]) & set(new["results"])):
+        b, n = base["results"][name], new["results"][name]
+        worst = 0.0
+        for key in ("p50_ms", "p99_ms"):
+            if n[key] - b[key] > min_ms and b[key] > 0:
+                worst = max(worst, (n[key] - b[key]) / b[key] * 100.0)
+        flag = "  REGRESSION" if worst > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:48} {b['p50_ms']:9.3f} {n['p50_ms']:9.3f} {b['p99_ms']:9.3f} {n['p99_ms']:9.3f}  "
+              f"{worst:+6.1f}%{flag}")
+    for name in sorted(set(base["results"]) ^ set(new["results"])):
+        print(f"{name:48} (only in {'base' if name in base['results'] else 'new'})")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fox-idle UI benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated chat history sizes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="compare two JSON runs instead of benchmarking")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="regression threshold in percent (p50/p99)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        return 1 if compare(base, new, args.threshold) else 0
+
+    data = run([int(s) for s in args.sizes.split(",") if s], args.seed)
+    text = json.dumps(data, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# chat_search.py
+import queue
+import threading
+import time
+from array import array
+from bisect import bisect_left
+import pygame
+from config import SEARCH_CHUNK, SEARCH_INDEX_BUDGET
+
+# acorda o loop principal quando a busca em segundo plano entrega resultados
+SEARCH_EVENT = pygame.event.custom_type()
+
+_EMPTY = array('I')
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class TrigramIndex:
+    """Inverted index from lowercase character trigrams to the (ascending)
+    indices of the messages that contain them. It only narrows the candidates:
+    matches are always checked against the text, so stale trigrams left by an
+    edited message are harmless."""
+
+    def __init__(self):
+        self._postings = {}  # trigram -> array('I') de mensagens
+        self.messages = 0  # mensagens indexadas (estatística)
+
+    def add(self, index, text):
+        """Index (or re-index, after an edit) the text of message `index`."""
+        self.messages += 1
+        postings = self._postings
+        for gram in _trigrams(text.lower()):
+            p = postings.get(gram)
+            if p is None:
+                p = postings[gram] = array('I')
+            if not p or p[-1] < index:
+                p.append(index)
+            elif p[-1] != index:
+                # edição de uma mensagem antiga (resposta do bot terminando)
+                pos = bisect_left(p, index)
+                if p[pos] != index:
+                    p.insert(pos, index)
+
+    def candidates(self, query):
+        """Ascending indices that may contain `query` (lowercase), or None
+        when the query is too short to filter (under three characters).
+        Walks the shortest posting list and bisects into the others, so the
+        cost follows the rarest trigram. Safe on the search worker while the
+        main thread keeps indexing: each list is copied (one C-level slice)
+        before the walk, and what is indexed meanwhile was still queued when
+        the search started, which ChatSearch checks anyway."""
+        grams = _trigrams(query)
+        if not grams:
+            return None
+        lists = sorted((self._postings.get(gram, _EMPTY)[:] for gram in grams), key=len)
+        shortest, others = lists[0], lists[1:]
+        out = []
+        for index in shortest:
+            for p in others:
+                pos = bisect_left(p, index)
+                if pos == len(p) or p[pos] != index:
+                    break
+            else:
+                out.append(index)
+        return out
+
+class ChatSearch:
+    """Case-insensitive substring search over the chat history.
+
+    Messages added in this session are indexed incrementally (TrigramIndex):
+    add() only queues the text and index_pending() indexes the queue a few
+    milliseconds per frame, so a burst of messages is not indexed in one
+    frame; until then a search simply checks the queued messages as well.
+    History from earlier sessions is not indexed (it can be millions of
+    messages) but scanned. Texts are checked on a worker thread, newest
+    first, in batches of SEARCH_CHUNK messages: each batch is handed to the
+    main thread by poll(), so the first matches show up at once and a new
+    query cancels the old scan."""
+
+    def __init__(self, store):
+        self.store = store
+        self.index = TrigramIndex()
+        self.query = ""
+        self.matches = []  # mensagens com ocorrência, em ordem crescente
+        self.running = False
+        self._generation = 0
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()  # (geração, mensagens, terminou)
+        self._thread = None
+        self._pending = []  # (mensagem, texto) ainda fora do índice
+
+    def add(self, index, text):
+        """Queue a new or edited message for indexing."""
+        self._pending.append((index, text))
+
+    def add_many(self, pairs):
+        self._pending.extend(pairs)
+
+    def pending(self):
+        return len(self._pending)
+
+    def index_pending(self, budget=SEARCH_INDEX_BUDGET):
+        """Index queued messages for at most `budget` seconds."""
+        pending = self._pending
+        deadline = time.perf_counter() + budget
+        done = 0
+        while done < len(pending):
+            self.index.add(*pending[done])
+            done += 1
+            if time.perf_counter() >= deadline:
+                break
+        del pending[:done]
+
+    def start(self, query):
+        """Search for `query` (restarting any search in progress)."""
+        self._generation += 1
+        self.query = query
+        self.matches = []
+        if not query:
+            self.running = False
+            return
+        # só o registro da consulta fica na thread principal; candidatos e
+        # varredura são do worker
+        self.running = True
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="search", daemon=True)
+            self._thread.start()
+        self._jobs.put((self._generation, query.lower(), list(self._pending), len(self.store), self.store.base))
+
+    def poll(self):
+        """Collect results delivered by the worker (main thread). Returns True
+        if the matches changed."""
+        changed = False
+        while True:
+            try:
+                generation, found, done = self._results.get_nowait()
+            except queue.Empty:
+                return changed
+            if generation != self._generation:
+                continue  # resultado de uma busca já substituída
+            if found:
+                # lotes chegam do mais novo para o mais antigo
+                self.matches = found + self.matches
+                changed = True
+            if done:
+                self.running = False
+                changed = True
+
+    def next_match(self, current, backwards=True):
+        """Match before (older) or after `current` (wrapping around); with
+        `current` None the newest match. None if there are no matches."""
+        matches = self.matches
+        if not matches:
+            return None
+        if current is None:
+            return matches[-1]
+        pos = bisect_left(matches, current)
+        if backwards:
+            return matches[pos - 1] if pos > 0 else matches[-1]
+        if pos < len(matches) and matches[pos] == current:
+            pos += 1
+        return matches[pos] if pos < len(matches) else matches[0]
+
+    def _worker(self):
+        reader = self.store.reader()
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                self._scan(reader, *job)
+        finally:
+            reader.close()
+
+    def _session(self, needle, pending, total, base):
+        """Session messages to check, newest first: the index candidates plus
+        what was still queued for indexing when the search started."""
+        candidates = self.index.candidates(needle)
+        if candidates is None:
+            return range(total - 1, base - 1, -1)
+        if pending:
+            candidates = sorted(set(candidates).union(i for i, _ in pending))
+        return candidates[::-1]
+
+    def _scan(self, reader, generation, needle, pending, total, base):
+        if generation != self._generation:
+            return  # já substituída enquanto esperava na fila
+        session = self._session(needle, pending, total, base)
+
+        def batches():
+            for i in range(0, len(session), SEARCH_CHUNK):
+                yield session[i:i + SEARCH_CHUNK]
+            for stop in range(base, 0, -SEARCH_CHUNK):
+                yield range(stop - 1, max(0, stop - SEARCH_CHUNK) - 1, -1)
+
+        for batch in batches():
+            if generation != self._generation:
+                return  # consulta mudou: abandona esta
+            found = [i for i in batch if needle in reader.text(i).lower()]
+            if found:
+                self._deliver(generation, found[::-1], False)
+        self._deliver(generation, [], True)
+
+    def _deliver(self, generation, found, done):
+        self._results.put((generation, found, done))
+        try:
+            pygame.event.post(pygame.event.Event(SEARCH_EVENT))
+        except pygame.error:
+            pass
+
+    def close(self):
+        """Stop the worker (before the store is closed)."""
+        self._generation += 1
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
@@ -1,104 +1,582 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
 import pygame
 from config import (
-    FONT_SIZE, PLAYER_INFO_HEIGHT_RATIO, CHATBOX_WIDTH_RATIO, MAIN_AREA_HEIGHT_RATIO,
-    BORDER_COLOR, BORDER_WIDTH, BLACK, USER_COLOR, BOT_COLOR, MARGIN, SCROLLBAR_WIDTH
+    FONT_SIZE, BORDER_WIDTH, BLACK, USER_COLOR, BOT_COLOR, MARGIN,
+    WRAP_CACHE_MESSAGES, SEARCH_MATCH_COLOR, SEARCH_CURRENT_COLOR, RELAYOUT_BUDGET, RELAYOUT_SCAN,
+    INGEST_MAX_PER_FRAME, SELECTION_COLOR
 )
 from scrollable_panel import ScrollablePanel
+from render_cache import shared_render_cache
+from text_wrap import get_width_cache, wrap_text
+from message_store import MessageStore, LineIndex
+from layout import Layout
+from chat_search import ChatSearch
+from clipboard import Clipboard
+from gui_regions import HIGHLIGHT_COLOR, draw_outline
+
+# cor de cada mensagem (índice guardado no MessageStore)
+CHAT_PALETTE = (USER_COLOR, BOT_COLOR)
+
+# acorda o loop principal quando chegam mensagens na fila (post_message)
+CHAT_INGEST = pygame.event.custom_type()
+
+class _ChatLines:
+    """Read-only view of the chat lines for ScrollablePanel. Lines are
+    materialized per message on access, so only the viewport is ever built."""
+
+    def __init__(self, chat):
+        self.chat = chat
+
+    def __len__(self):
+        return self.chat.line_index.total
+
+    def __getitem__(self, key):
+        chat = self.chat
+        index = chat.line_index
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            out = []
+            if start >= stop:
+                return out
+            i = index.find(start)
+            pos = start - index.start(i)
+            while len(out) < stop - start and i < len(index):
+                lines = chat._lines_for(i)
+                out.extend(lines[pos:pos + (stop - start - len(out))])
+                i += 1
+                pos = 0
+            return out
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        i = index.find(key)
+        return chat._lines_for(i)[key - index.start(i)]
 
 class ChatWindow:
-    def __init__(self, surface):
+    def __init__(self, surface, store=None, layout=None, clipboard=None):
         self.surface = surface
+        # rects de todas as regiões, recalculados só quando a janela muda de tamanho
+        self.layout = layout if layout is not None else Layout(surface.get_size())
         self.line_height = FONT_SIZE + 5
-        self.messages = []  # list of dicts {sender, text}
+        self.messages = store if store is not None else MessageStore()  # compact history
+        self.line_index = LineIndex()  # panel line count of each message
+        self._wrap_widths = array('H')  # width each message's line count is for (0 = unwrapped)
+        self._wrapped = OrderedDict()  # message -> panel lines, LRU of materialized messages
+        self._width_cache = None  # WidthCache of the font used to draw the chat
+        self._dirty_rects = []
+        self._relayout_pos = 0  # re-wrap em fatias: próximas mensagens a checar estão abaixo daqui
+        # mensagens postadas de qualquer thread, aplicadas em lotes no update
+        self._inbox = deque()
+        self._inbox_lock = threading.Lock()
+        self._wake_posted = False
+        self.ingested = 0  # estatística: mensagens aplicadas da fila
+        # busca (Ctrl+F com o chat ativo): índice atualizado a cada add_message
+        self.search = ChatSearch(self.messages)
+        self.search_active = False
+        self.search_current = None  # mensagem do resultado selecionado
+        # seleção com o mouse: pontas (mensagem, linha na mensagem, caractere)
+        self.selection = None  # (âncora, ponta) ou None
+        self.selecting = False  # botão ainda pressionado
+        self.clipboard = clipboard
         self._create_panel()
         self._rebuild_lines_from_messages()
+        self.layout.subscribe(lambda layout: self.rebuild_cache())
 
     def _create_panel(self):
         rect = self.get_chat_rect()
-        self.panel = ScrollablePanel(rect, self.line_height)
+        self.panel = ScrollablePanel(rect, self.line_height, shared_render_cache, kinetic=True)
+        self.panel.draw_track = False  # trilho na camada estática
 
     def get_player_info_rect(self):
-        return pygame.Rect(
-            MARGIN, MARGIN,
-            self.surface.get_width() - 2 * MARGIN,
-            int(self.surface.get_height() * PLAYER_INFO_HEIGHT_RATIO) - 2 * MARGIN
-        )
+        return self.layout.player
 
     def get_chat_rect(self):
-        y = self.get_player_info_rect().bottom + MARGIN
-        height = int(self.surface.get_height() * MAIN_AREA_HEIGHT_RATIO) - 2 * MARGIN
-        width = int(self.surface.get_width() * CHATBOX_WIDTH_RATIO) - MARGIN - SCROLLBAR_WIDTH
-        return pygame.Rect(MARGIN, y, width, height)
+        return self.layout.chat
 
     def get_game_info_rect(self):
-        y = self.get_player_info_rect().bottom + MARGIN
-        height = int(self.surface.get_height() * MAIN_AREA_HEIGHT_RATIO) - 2 * MARGIN
-        x = self.get_chat_rect().right + SCROLLBAR_WIDTH + 2 * MARGIN
-        width = self.surface.get_width() - x - MARGIN
-        return pygame.Rect(x, y, width, height)
+        return self.layout.game
+
+    def get_chat_area_rect(self):
+        """Chat rect plus its scrollbar (everything the panel draws)."""
+        return self.layout.chat_area
+
+    def mark_dirty(self, rect=None):
+        """Report a changed rect to the dirty-rect renderer (None = whole window)."""
+        self._dirty_rects.append(self.surface.get_rect() if rect is None else pygame.Rect(rect))
+
+    def pop_dirty_rects(self):
+        rects = self._dirty_rects
+        self._dirty_rects = []
+        return rects
 
     def rebuild_cache(self):
+        # as visíveis são re-quebradas no próximo draw; as outras em fatias (update)
         self.panel.set_rect(self.get_chat_rect())
-        self._rebuild_lines_from_messages()
         self.panel._ensure_scroll_bounds()
         self.panel.auto_scroll_to_bottom()  # Forçar rolagem ao final após redimensionamento
+        self._relayout_pos = len(self.messages)
+        self.clear_selection()  # as linhas vão ser re-quebradas
+        self.mark_dirty()
+
+    def _relayout_slice(self, budget=RELAYOUT_BUDGET):
+        """Re-wrap, newest first, off-screen messages whose line count was
+        measured at another width, for at most `budget` seconds. Messages
+        never wrapped (counted as one line) are left to _wrap_visible. The
+        top visible line stays put unless the view is at the bottom."""
+        width = self._wrap_width()
+        if self._width_cache is None:
+            return
+        panel = self.panel
+        index = self.line_index
+        widths = self._wrap_widths
+        at_bottom = panel.scroll >= max(0, len(panel.lines) - panel.visible_lines_count())
+        top_msg = index.find(panel.scroll) if len(index) else 0
+        top_within = panel.scroll - index.start(top_msg) if len(index) else 0
+
+        deadline = time.perf_counter() + budget
+        i = self._relayout_pos
+        stop = max(0, i - RELAYOUT_SCAN)
+        changed = False
+        while i > stop:
+            i -= 1
+            if widths[i] and widths[i] != width:
+                lines = self._message_to_lines(i, width)
+                index.set(i, len(lines))
+                widths[i] = width
+                self._wrapped.pop(i, None)
+                changed = True
+                if time.perf_counter() >= deadline:
+                    break
+        self._relayout_pos = i
+
+        if changed:
+            if at_bottom:
+                panel.auto_scroll_to_bottom()
+            else:
+                panel.scroll = index.start(top_msg) + min(top_within, index.counts[top_msg] - 1)
+                panel._ensure_scroll_bounds()
+            self.mark_dirty(self.get_chat_area_rect())
+
+    def _wrap_width(self):
+        return max(1, self.panel.rect.width - 2 * MARGIN)
+
+    def _message_to_lines(self, index, max_w=None):
+        messages = self.messages
+        sender = messages.sender(index)
+        text = messages.text(index)
+        color = CHAT_PALETTE[messages.color_index(index)]
+        rows = text.split("\n") if text != "" else [""]
+        prefix = f'{sender.capitalize()}: '
+        indent = " " * len(prefix)
+        cache = self._width_cache
+        if max_w and cache is not None:
+            avail = max_w - max(cache.text_width(prefix), cache.text_width(indent))
+            rows = [row for p in rows for row in wrap_text(p, avail, cache)]
+        out = [(prefix + rows[0], color)]
+        for ln in rows[1:]:
+            out.append((indent + ln, color))
+        return out
+
+    def _cache_lines(self, index, lines):
+        self._wrapped[index] = lines
+        self._wrapped.move_to_end(index)
+        if len(self._wrapped) > WRAP_CACHE_MESSAGES:
+            self._wrapped.popitem(last=False)
+
+    def _lines_for(self, index):
+        """Panel lines of message `index`, always exactly its line count long.
+        A message whose count is only an estimate (not wrapped at the current
+        width yet) is padded/truncated; _wrap_visible fixes it once in view."""
+        lines = self._wrapped.get(index)
+        if lines is None:
+            lines = self._message_to_lines(index, self._wrap_widths[index])
+            self._cache_lines(index, lines)
+        else:
+            self._wrapped.move_to_end(index)
+        count = self.line_index.counts[index]
+        if len(lines) != count:
+            lines = (lines + [("", lines[0][1])] * count)[:count]
+        if self.search_active and self.search.matches and self._is_match(index):
+            lines = self._mark_lines(lines, index == self.search_current)
+        if self.selection is not None:
+            lines = self._select_lines(lines, index)
+        return lines
+
+    def _is_match(self, index):
+        matches = self.search.matches
+        pos = bisect_left(matches, index)
+        return pos < len(matches) and matches[pos] == index
+
+    def _mark_lines(self, lines, current):
+        """Copy of `lines` with the occurrences of the query marked."""
+        needle = self.search.query.lower()
+        bg = SEARCH_CURRENT_COLOR if current else SEARCH_MATCH_COLOR
+        out = []
+        for text, color in lines:
+            low = text.lower()
+            marks = []
+            pos = low.find(needle)
+            while pos >= 0:
+                marks.append((pos, pos + len(needle), bg))
+                pos = low.find(needle, pos + len(needle))
+            out.append((text, color, tuple(marks)) if marks else (text, color))
+        return out
+
+    def _select_lines(self, lines, index):
+        """`lines` of message `index` with the selected part marked."""
+        (m0, r0, c0), (m1, r1, c1) = self.selection_bounds()
+        if not m0 <= index <= m1:
+            return lines
+        out = list(lines)
+        for row, line in enumerate(lines):
+            if (index, row) < (m0, r0) or (index, row) > (m1, r1):
+                continue
+            # colunas limitadas ao texto: a mensagem pode ter mudado (resposta em streaming)
+            start = min(c0, len(line[0])) if (index, row) == (m0, r0) else 0
+            end = min(c1, len(line[0])) if (index, row) == (m1, r1) else len(line[0])
+            if end > start:
+                out[row] = (line[0], line[1], (line[2] if len(line) > 2 else ()) + ((start, end, SELECTION_COLOR),))
+        return out
 
     def _rebuild_lines_from_messages(self):
-        flat = []
-        for msg in self.messages:
-            color = USER_COLOR if msg["sender"] == "user" else BOT_COLOR
-            lines = msg["text"].split("\n") if msg["text"] != "" else [""]
-            prefix = f'{msg["sender"].capitalize()}: '
-            flat.append((prefix + lines[0], color))
-            indent = " " * len(prefix)
-            for ln in lines[1:]:
-                flat.append((indent + ln, color))
-        self.panel.set_lines(flat)
+        """Full rebuild (startup). Stored messages start as one line each, so no
+        text is read here; the ones scrolled into view (at first, the last
+        screenful) get their real count from _wrap_visible."""
+        n = len(self.messages)
+        self.line_index = LineIndex.ones(n)
+        self._wrap_widths = array('H', bytes(2 * n))
+        self._wrapped.clear()
+        self.panel.set_line_source(_ChatLines(self))
+
+    def message_at_line(self, line):
+        """Index of the message that owns panel line `line`."""
+        return self.line_index.find(line)
+
+    def message_line_range(self, index):
+        """Return (first_line, end_line) of the panel lines for message `index`."""
+        start = self.line_index.start(index)
+        return start, start + self.line_index.counts[index]
+
+    def _set_message_lines(self, index, lines, width):
+        self.line_index.set(index, len(lines))
+        self._wrap_widths[index] = width
+        self._cache_lines(index, lines)
+
+    def _wrap_visible(self, font):
+        """Wrap (lazily) the messages that are in view at the current width.
+        Returns True if any panel line changed."""
+        if self._width_cache is None or self._width_cache.font is not font:
+            self._width_cache = get_width_cache(font)
+            self._wrap_widths = array('H', bytes(2 * len(self.messages)))
+            self._wrapped.clear()
+        if not len(self.messages):
+            return False
+        width = self._wrap_width()
+        panel = self.panel
+        index = self.line_index
+        visible = panel.visible_lines_count()
+        at_bottom = panel.scroll >= max(0, len(panel.lines) - visible)
+        top_msg = index.find(panel.scroll)
+        top_within = panel.scroll - index.start(top_msg)
+
+        changed = False
+        while True:
+            if at_bottom:
+                panel.auto_scroll_to_bottom()
+            else:
+                panel.scroll = index.start(top_msg) + min(top_within, index.counts[top_msg] - 1)
+                panel._ensure_scroll_bounds()
+            first = index.find(panel.scroll)
+            # + a linha parcial de baixo durante a rolagem por pixel
+            last = index.find(min(index.total - 1, panel.scroll + visible))
+            stale = [i for i in range(first, last + 1) if self._wrap_widths[i] != width]
+            if not stale:
+                return changed
+            for i in stale:
+                self._set_message_lines(i, self._message_to_lines(i, width), width)
+            changed = True
 
     def add_message(self, sender, text):
-        self.messages.append({"sender": sender, "text": text})
-        self._rebuild_lines_from_messages()
-        self.panel._ensure_scroll_bounds()
-        self.panel.auto_scroll_to_bottom()  # Forçar rolagem ao final após nova mensagem
+        return self.add_messages([(sender, text)])[0]
+
+    def add_messages(self, items):
+        """Append (sender, text) messages with a single bounds/scroll update
+        and dirty rect. Only the last screenful can be in view afterwards, so
+        only those are wrapped now; earlier ones count as one line until
+        scrolled to, like stored history. Returns the range of new indices."""
+        items = list(items)
+        first = len(self.messages)
+        width = self._wrap_width() if self._width_cache else 0
+        wrap_from = len(items) - self.panel.visible_lines_count()  # cada mensagem ocupa >= 1 linha
+        for n, (sender, text) in enumerate(items):
+            index = self.messages.append(sender, text, 0 if sender == "user" else 1)
+            if n >= wrap_from:
+                # append path: only the new message is converted into panel lines
+                lines = self._message_to_lines(index, width)
+                self.line_index.append(len(lines))
+                self._wrap_widths.append(width)
+                self._cache_lines(index, lines)
+            else:
+                self.line_index.append(1)
+                self._wrap_widths.append(0)
+        if items:
+            self.search.add_many(list(zip(range(first, len(self.messages)), (text for _, text in items))))
+            self.panel._ensure_scroll_bounds()
+            self.panel.auto_scroll_to_bottom()  # Forçar rolagem ao final após nova mensagem
+            self.mark_dirty(self.get_chat_area_rect())
+        return range(first, len(self.messages))
+
+    def post_message(self, sender, text):
+        """Queue a message from any thread; update() applies the queue in
+        batches of at most INGEST_MAX_PER_FRAME messages per frame."""
+        with self._inbox_lock:
+            self._inbox.append((sender, text))
+            wake = not self._wake_posted
+            self._wake_posted = True
+        if wake:
+            try:
+                pygame.event.post(pygame.event.Event(CHAT_INGEST))
+            except pygame.error:
+                pass  # display fechado: a fila basta
+
+    def backlog(self):
+        """Queued messages not applied yet."""
+        return len(self._inbox)
+
+    def _ingest(self, limit=INGEST_MAX_PER_FRAME):
+        with self._inbox_lock:
+            batch = [self._inbox.popleft() for _ in range(min(limit, len(self._inbox)))]
+            self._wake_posted = False
+        self.add_messages(batch)
+        self.ingested += len(batch)
+
+    def append_to_message(self, index, chunk):
+        """Append `chunk` to message `index` (streamed replies) and re-wrap only it."""
+        if not chunk:
+            return
+        self.set_message_text(index, self.messages.text(index) + chunk)
+
+    def set_message_text(self, index, text):
+        """Replace the text of a resident message and re-wrap only it."""
+        panel = self.panel
+        at_bottom = panel.scroll >= max(0, len(panel.lines) - panel.visible_lines_count())
+        self.messages.set_text(index, text)
+        self.search.add(index, text)
+        width = self._wrap_width() if self._width_cache else 0
+        self._set_message_lines(index, self._message_to_lines(index, width), width)
+        panel._ensure_scroll_bounds()
+        if at_bottom:
+            panel.auto_scroll_to_bottom()
+        self.mark_dirty(self.get_chat_area_rect())
 
     def process_event(self, event):
-        chat_rect = self.get_chat_rect()
+        old_position = self.panel.position()
+        self._process_event(event)
+        if self.panel.position() != old_position:
+            self.mark_dirty(self.get_chat_area_rect())
+
+    def _process_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_c and event.mod & pygame.KMOD_CTRL:
+                self.copy_selection()
+            else:
+                self._process_search_key(event)
+            return
+
         if event.type == pygame.MOUSEWHEEL:
-            if chat_rect.collidepoint(pygame.mouse.get_pos()) and not self.panel.dragging:
+            # panel.rect é o rect do chat (atualizado em rebuild_cache)
+            if self.panel.rect.collidepoint(pygame.mouse.get_pos()) and not self.panel.dragging:
                 self.panel.process_event(event)
             return
 
-        bar, handle = self.panel._scrollbar_rects()
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            bar, handle = self.panel._scrollbar_rects()
             if handle.height > 0 and handle.collidepoint(event.pos):
                 self.panel.process_event(event)
                 return
+            if self.panel.rect.collidepoint(event.pos):
+                point = self.point_at(event.pos)
+                self.selection = (point, point) if point is not None else None
+                self.selecting = point is not None
+                self.mark_dirty(self.get_chat_area_rect())
+                return
 
         if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
             if self.panel.dragging:
                 self.panel.process_event(event)
+            elif self.selecting:
+                self._drag_selection(event)
+
+    def _drag_selection(self, event):
+        """Move the free end of the selection to the pointer; above or below
+        the panel the chat scrolls one line per motion event."""
+        panel = self.panel
+        y = event.pos[1]
+        if y < panel.rect.top:
+            panel.set_position(panel.position() - self.line_height)
+        elif y >= panel.rect.bottom:
+            panel.set_position(panel.position() + self.line_height)
+        point = self.point_at(event.pos)
+        if point is not None and point != self.selection[1]:
+            self.selection = (self.selection[0], point)
+            self.mark_dirty(self.get_chat_area_rect())
+        if event.type == pygame.MOUSEBUTTONUP:
+            self.selecting = False
+            if self.selection[0] == self.selection[1]:
+                self.clear_selection()  # clique simples: nada selecionado
+
+    def point_at(self, pos):
+        """(message, row, column) of the character boundary nearest to the
+        screen position `pos`. The line comes from the scroll offset and the
+        column from a bisect over the line's cached character positions
+        (WidthCache.prefix_widths), so dragging measures no text per event."""
+        hit = self.panel.hit_test(pos)
+        if hit is None or self._width_cache is None:
+            return None
+        line, x = hit
+        index = self.line_index.find(line)
+        row = line - self.line_index.start(index)
+        text = self._lines_for(index)[row][0]
+        return index, row, self._width_cache.index_at(text, x)
+
+    def selection_bounds(self):
+        """The selection ends in reading order, or None."""
+        if self.selection is None:
+            return None
+        return tuple(sorted(self.selection))
+
+    def selected_text(self):
+        """Selected text as displayed, one panel line per text line."""
+        bounds = self.selection_bounds()
+        if bounds is None or bounds[0] == bounds[1]:
+            return ""
+        (m0, r0, c0), (m1, r1, c1) = bounds
+        first = self.line_index.start(m0) + r0
+        last = self.line_index.start(m1) + r1
+        lines = [line[0] for line in self.panel.lines[first:last + 1]]
+        if len(lines) == 1:
+            lines[0] = lines[0][c0:c1]
+        else:
+            lines[0], lines[-1] = lines[0][c0:], lines[-1][:c1]
+        return "\n".join(lines)
+
+    def copy_selection(self):
+        """Copy the selection to the clipboard (Ctrl+C with the chat active).
+        Returns the copied text ("" when nothing is selected)."""
+        text = self.selected_text()
+        if text:
+            if self.clipboard is None:
+                self.clipboard = Clipboard()
+            self.clipboard.copy(text)
+        return text
+
+    def clear_selection(self):
+        if self.selection is not None:
+            self.selection = None
+            self.mark_dirty(self.get_chat_area_rect())
+        self.selecting = False
+
+    def _process_search_key(self, event):
+        """Ctrl+F opens/closes the search; while open, typing edits the query,
+        Enter jumps to the previous (older) match, Shift+Enter to the next and
+        Esc closes it."""
+        if event.key == pygame.K_f and event.mod & pygame.KMOD_CTRL:
+            self.set_search_active(not self.search_active)
+        elif not self.search_active:
+            return
+        elif event.key == pygame.K_ESCAPE:
+            self.set_search_active(False)
+        elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            self.jump_to_match(backwards=not event.mod & pygame.KMOD_SHIFT)
+        elif event.key == pygame.K_BACKSPACE:
+            self.set_search_query(self.search.query[:-1])
+        elif event.unicode and event.unicode.isprintable() and not event.mod & pygame.KMOD_CTRL:
+            self.set_search_query(self.search.query + event.unicode)
+
+    def set_search_active(self, active):
+        self.search_active = active
+        if not active:
+            self.search.start("")
+            self.search_current = None
+        self.mark_dirty(self.get_chat_area_rect())
+
+    def set_search_query(self, query):
+        """Start searching for `query`; the newest match is selected as soon
+        as the background search finds it."""
+        self.search.start(query)
+        self.search_current = None
+        self.mark_dirty(self.get_chat_area_rect())
+
+    def jump_to_match(self, backwards=True):
+        """Select the previous/next match and scroll it into view."""
+        index = self.search.next_match(self.search_current, backwards)
+        if index is None:
+            return
+        self.search_current = index
+        first, end = self.message_line_range(index)
+        # mensagem longa: mostra o começo; curta: ela inteira
+        self.panel.ensure_line_visible(end - 1)
+        self.panel.ensure_line_visible(first)
+        self.mark_dirty(self.get_chat_area_rect())
+
+    def close(self):
+        """Stop the search worker, then flush and close the history log."""
+        self.search.close()
+        self.messages.close()
+
+    def next_timer(self):
+        """Seconds until the chat needs an update on its own (None: only on input)."""
+        return 0.0 if self._relayout_pos or self._inbox or self.search.pending() else None
+
+    def is_animating(self):
+        return self.panel.is_animating() or self.selecting
 
     def update(self, dt):
-        pass
+        if self._inbox:
+            self._ingest()
+        if self._relayout_pos:
+            self._relayout_slice()
+        if self.search.pending():
+            self.search.index_pending()
+        if self.panel.update(dt):
+            self.mark_dirty(self.get_chat_area_rect())
+        if self.search.poll():
+            if self.search_current is None and self.search.matches:
+                self.jump_to_match()
+            self.mark_dirty(self.get_chat_area_rect())
 
     def draw(self, font, active_area):
-        p_rect = self.get_player_info_rect()
-        pygame.draw.rect(self.surface, BORDER_COLOR, p_rect, BORDER_WIDTH)
-        player_text = font.render("Informações do Jogador", True, (0, 200, 0))
-        self.surface.blit(player_text, (p_rect.x + MARGIN, p_rect.y + MARGIN))
-
+        # bordas, títulos e trilho da barra vêm da camada estática do Renderer
         chat_rect = self.get_chat_rect()
-        pygame.draw.rect(self.surface, BORDER_COLOR, chat_rect, BORDER_WIDTH)
-        if self.panel.rect != chat_rect:
-            self.panel.set_rect(chat_rect)
-            self.panel._ensure_scroll_bounds()
-            self.panel.auto_scroll_to_bottom()  # Forçar rolagem ao final após atualização do retângulo
+        if self._wrap_visible(font):
+            self.mark_dirty(self.get_chat_area_rect())
         self.panel.draw(font, self.surface)
 
-        g_rect = self.get_game_info_rect()
-        pygame.draw.rect(self.surface, BORDER_COLOR, g_rect, BORDER_WIDTH)
-        game_text = font.render("Informações do Jogo", True, (200, 0, 0))
-        self.surface.blit(game_text, (g_rect.x + MARGIN, g_rect.y + MARGIN))
+        if self.search_active:
+            self._draw_search_bar(font, chat_rect)
 
         if active_area == 'chat':
-            pygame.draw.rect(self.surface, (255, 255, 0), chat_rect, 3)
\ No newline at end of file
+            draw_outline(self.surface, HIGHLIGHT_COLOR, chat_rect, 3)
+
+    def _draw_search_bar(self, font, chat_rect):
+        """Query, match position and progress over the bottom of the chat."""
+        search = self.search
+        bar = pygame.Rect(chat_rect.x + BORDER_WIDTH, chat_rect.bottom - self.line_height - BORDER_WIDTH,
+                          chat_rect.width - 2 * BORDER_WIDTH, self.line_height)
+        pygame.draw.rect(self.surface, (40, 40, 40), bar)
+        if search.matches:
+            pos = len(search.matches) - bisect_left(search.matches, self.search_current) \
+                if self.search_current is not None else 0
+            status = f"{pos}/{len(search.matches)}"
+        else:
+            status = "sem resultados" if search.query and not search.running else ""
+        if search.running:
+            status += " ..."
+        text = f"Buscar: {search.query}_   {status}"
+        self.surface.blit(self.panel.render_cache.render(font, text, (230, 230, 230)),
+                          (bar.x + MARGIN, bar.y + 2))
\ No newline at end of file
@@ -0,0 +1,134 @@
+# clipboard.py
+import queue
+import threading
+import pygame
+import pyperclip
+
+# acorda o loop principal quando o worker termina uma leitura/escrita
+CLIPBOARD_EVENT = pygame.event.custom_type()
+
+class ScrapBackend:
+    """pygame.scrap: in-process SDL clipboard. SDL wants it on the main
+    thread, and it does not spawn processes, so it is called inline."""
+
+    threaded = False
+
+    def __init__(self):
+        scrap = pygame.scrap
+        if not scrap.get_init():
+            scrap.init()  # precisa de display; pygame.error se não houver
+        self._modern = hasattr(scrap, "get_text")  # pygame-ce
+
+    def paste(self):
+        if self._modern:
+            return pygame.scrap.get_text()
+        data = pygame.scrap.get(pygame.SCRAP_TEXT)
+        if not data:
+            return ""
+        return data.decode("utf-8", errors="replace").rstrip("\x00")
+
+    def copy(self, text):
+        if self._modern:
+            pygame.scrap.put_text(text)
+        else:
+            pygame.scrap.put(pygame.SCRAP_TEXT, text.encode("utf-8"))
+
+class PyperclipBackend:
+    """pyperclip shells out to xclip/xsel/pbpaste, so it runs on the worker."""
+
+    threaded = True
+
+    def paste(self):
+        return pyperclip.paste()
+
+    def copy(self, text):
+        pyperclip.copy(text)
+
+def default_backend():
+    try:
+        return ScrapBackend()
+    except (pygame.error, NotImplementedError, AttributeError):
+        return PyperclipBackend()
+
+class Clipboard:
+    """Clipboard access that never blocks the frame loop. request_paste() and
+    copy() return at once; pasted text is collected with poll() (the worker
+    also posts CLIPBOARD_EVENT so an idle loop wakes up). If the inline backend
+    fails, the request is retried with pyperclip on the worker thread."""
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._jobs = queue.Queue()  # (op, text) para a thread de trabalho
+        self._results = queue.Queue()  # texto colado
+        self._thread = None
+        self.in_flight = 0  # leituras pedidas e ainda não entregues
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = default_backend()
+        return self._backend
+
+    def request_paste(self):
+        self.in_flight += 1
+        backend = self.backend
+        if backend.threaded:
+            self._submit("paste", None)
+            return
+        try:
+            self._results.put(backend.paste() or "")
+        except pygame.error:
+            self._submit("paste", None)
+
+    def copy(self, text):
+        backend = self.backend
+        if backend.threaded:
+            self._submit("copy", text)
+            return
+        try:
+            backend.copy(text)
+        except pygame.error:
+            self._submit("copy", text)
+
+    def poll(self):
+        """Pasted texts that arrived since the last call (main thread)."""
+        out = []
+        while True:
+            try:
+                out.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        self.in_flight -= len(out)
+        return out
+
+    def _submit(self, op, text):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="clipboard", daemon=True)
+            self._thread.start()
+        self._jobs.put((op, text))
+
+    def _worker(self):
+        backend = self._backend if self._backend.threaded else PyperclipBackend()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            op, text = job
+            try:
+                if op == "copy":
+                    backend.copy(text)
+                    continue
+                result = backend.paste() or ""
+            except Exception:  # sem clipboard no sistema: cópia ignorada, colagem vazia
+                if op == "copy":
+                    continue
+                result = ""
+            self._results.put(result)
+            try:
+                pygame.event.post(pygame.event.Event(CLIPBOARD_EVENT))
+            except pygame.error:
+                pass
+
+    def close(self):
+        if self._thread is not None:
+            self._jobs.put(None)
@@ -1,10 +1,19 @@
 # config.py
+import os
+
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
 FPS = 60
 
 FONT_NAME = "segoeuiemoji"
 FONT_SIZE = 18
+# fonts tried, in order, for code points FONT_NAME has no glyph for (emoji...)
+FALLBACK_FONT_NAMES = ("segoeuiemoji", "notocoloremoji", "applecoloremoji", "symbola", "dejavusans")
+# resolved system font paths, so startup skips the font directory scan
+FONT_PATH_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "fox-idle", "fonts.json"
+)
 
 # Cores
 BLACK = (0, 0, 0)
@@ -18,6 +27,13 @@ SCROLLBAR_WIDTH = 16
 SCROLLBAR_COLOR = (100, 100, 100)
 SCROLLBAR_HANDLE_COLOR = (180, 180, 180)
 
+# Kinetic scrolling (chat): a wheel notch travels SCROLL_LINES_PER_NOTCH
+# lines in total, decelerating with SCROLL_FRICTION (1/s); below
+# SCROLL_MIN_SPEED (px/s) the motion stops
+SCROLL_LINES_PER_NOTCH = 3
+SCROLL_FRICTION = 12.0
+SCROLL_MIN_SPEED = 15.0
+
 # Layout proportions
 PLAYER_INFO_HEIGHT_RATIO = 0.1
 CHATBOX_WIDTH_RATIO = 0.7
@@ -28,4 +44,85 @@ INPUT_HEIGHT_RATIO = 0.1
 # Borders & buttons
 BORDER_WIDTH = 2
 SEND_BUTTON_WIDTH = 72   # reduced to fit margins
-SEND_BUTTON_HEIGHT = 36
\ No newline at end of file
+SEND_BUTTON_HEIGHT = 36
+
+# Resize: relayout only once the window size has been stable for
+# RESIZE_DEBOUNCE seconds (a scaled snapshot is shown meanwhile); then the
+# chat re-wraps off-screen messages (and the input box its paragraphs) in
+# slices of at most RELAYOUT_BUDGET seconds and RELAYOUT_SCAN checked
+# messages per frame
+RESIZE_DEBOUNCE = 0.15
+RELAYOUT_BUDGET = 0.004
+RELAYOUT_SCAN = 50000
+
+# Render cache (rendered line surfaces, LRU)
+RENDER_CACHE_SIZE = 512
+
+# Rendering: "full" redraws the whole window every frame,
+# "dirty" redraws and updates only the rects reported as changed
+RENDER_MODE = "dirty"
+
+# Frame scheduler: after IDLE_AFTER seconds without input the loop stops
+# ticking at FPS and blocks until the next timer (capped at IDLE_MAX_WAIT)
+IDLE_AFTER = 2.0
+IDLE_MAX_WAIT = 1.0
+
+# Text width cache (per font): max cached word advances before reset
+WIDTH_CACHE_WORDS = 4096
+# and max lines whose character positions are cached (chat selection hit-test)
+WIDTH_CACHE_LINES = 512
+
+# Input cursor (overlay bar drawn over the text)
+CURSOR_WIDTH = 2
+
+# Paste: large clipboard texts are inserted this many chars per frame
+PASTE_CHUNK_CHARS = 4096
+
+# Chat history: texts kept in memory; older ones are read back from the
+# append-only log in pages (LRU of pages) when scrolled to
+HISTORY_MEMORY_WINDOW = 2000
+HISTORY_PAGE_SIZE = 256
+HISTORY_PAGE_CACHE = 16
+# persistent history (append-only log + index), and how often pending
+# writes are flushed/fsynced by the background thread (seconds)
+HISTORY_DIR = os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "fox-idle"
+)
+HISTORY_FSYNC_INTERVAL = 1.0
+# messages whose wrapped lines are kept materialized (LRU)
+WRAP_CACHE_MESSAGES = 1024
+
+# Queued chat ingestion (ChatWindow.post_message): most queued messages
+# applied per frame; the rest wait for the next frames
+INGEST_MAX_PER_FRAME = 200
+
+# Chat search (Ctrl+F in the chat): messages checked per batch by the
+# background search, seconds per frame spent indexing new messages, and
+# highlight colors (all matches / current match)
+SEARCH_CHUNK = 2000
+SEARCH_INDEX_BUDGET = 0.002
+SEARCH_MATCH_COLOR = (90, 80, 0)
+SEARCH_CURRENT_COLOR = (200, 110, 0)
+
+# Chat text selection (mouse drag, Ctrl+C copies)
+SELECTION_COLOR = (50, 80, 140)
+
+# Profiler (F3 toggles instrumentation + overlay, F4 dumps a trace file)
+PROFILER_FRAMES = 600  # per-frame timings kept in the ring buffer
+PROFILER_EVENTS = 50000  # individual timed calls kept for the trace dump
+PROFILER_GRAPH_FRAMES = 120
+
+# Idle simulation: fixed tick (s), most offline time credited when a save
+# is loaded (s), autosave interval (s), save file (in the history dir) and
+# how often the info panels re-read the values (s)
+SIM_TICK = 0.1
+SIM_OFFLINE_CAP = 24 * 3600.0
+SIM_AUTOSAVE_INTERVAL = 60.0
+SAVE_FILE = "save.json"
+INFO_REFRESH_INTERVAL = 0.25
+
+# Bot replies: produced on worker threads and streamed into the chat
+BOT_REPLY = "N/D"
+BOT_MAX_CONCURRENT = 2
+BOT_TIMEOUT = 30.0  # seconds
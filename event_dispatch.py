@@ -0,0 +1,99 @@
+# event_dispatch.py
+import pygame
+
+# tipos que o loop trata; TEXTINPUT fica liberado porque o pygame o usa para
+# preencher KEYDOWN.unicode
+HANDLED_EVENTS = (
+    pygame.QUIT, pygame.VIDEORESIZE, pygame.WINDOWEXPOSED, pygame.KEYDOWN, pygame.TEXTINPUT,
+    pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL,
+)
+
+# tipos que nada no jogo lê: bloqueados para não encher a fila nem acordar o loop
+UNUSED_EVENTS = (
+    pygame.KEYUP, pygame.TEXTEDITING, pygame.ACTIVEEVENT, pygame.KEYMAPCHANGED,
+    pygame.WINDOWMOVED, pygame.WINDOWENTER, pygame.WINDOWLEAVE,
+    pygame.JOYAXISMOTION, pygame.JOYBALLMOTION, pygame.JOYHATMOTION,
+    pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED,
+    pygame.CONTROLLERAXISMOTION, pygame.CONTROLLERBUTTONDOWN, pygame.CONTROLLERBUTTONUP,
+    pygame.CONTROLLERDEVICEADDED, pygame.CONTROLLERDEVICEREMOVED, pygame.CONTROLLERDEVICEREMAPPED,
+    pygame.CONTROLLERTOUCHPADDOWN, pygame.CONTROLLERTOUCHPADMOTION, pygame.CONTROLLERTOUCHPADUP,
+    pygame.CONTROLLERSENSORUPDATE, pygame.FINGERDOWN, pygame.FINGERUP, pygame.FINGERMOTION,
+    pygame.MULTIGESTURE, pygame.DROPFILE, pygame.DROPTEXT, pygame.DROPBEGIN, pygame.DROPCOMPLETE,
+    pygame.AUDIODEVICEADDED, pygame.AUDIODEVICEREMOVED, pygame.CLIPBOARDUPDATE,
+    pygame.LOCALECHANGED, pygame.SYSWMEVENT,
+)
+
+MOUSE_POS_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+MOUSE_EVENTS = MOUSE_POS_EVENTS + (pygame.MOUSEWHEEL,)
+
+class EventDispatcher:
+    """Filters, coalesces and routes the events of a frame.
+
+    install() blocks the event types nothing reads. MOUSEMOTION is only let
+    through while an area captures the mouse (scrollbar drag), so moving the
+    pointer over the window does not keep the loop awake. coalesce() merges
+    runs of motion/wheel events into one, and route() gives the target area
+    of a mouse event from the GUIRegions hit-test table."""
+
+    def __init__(self, regions):
+        self.regions = regions
+        self.capture = None  # área que recebe o mouse durante um arrasto
+        self.motion_allowed = True
+        self.coalesced = 0  # eventos fundidos (estatística)
+
+    def install(self, extra=()):
+        """Set the event filter; `extra` are custom types posted by workers."""
+        pygame.event.set_blocked(list(UNUSED_EVENTS))
+        pygame.event.set_allowed(list(HANDLED_EVENTS) + list(extra))
+        self._allow_motion(self.capture is not None)
+
+    def _allow_motion(self, allowed):
+        if allowed != self.motion_allowed:
+            if allowed:
+                pygame.event.set_allowed(pygame.MOUSEMOTION)
+            else:
+                pygame.event.set_blocked(pygame.MOUSEMOTION)
+            self.motion_allowed = allowed
+
+    def set_capture(self, area):
+        """Send every mouse event to `area` (None releases the mouse)."""
+        self.capture = area
+        self._allow_motion(area is not None)
+
+    def coalesce(self, events):
+        """Merge consecutive MOUSEMOTION (last position, summed rel) and
+        MOUSEWHEEL (summed deltas) events. Order is kept: a click between two
+        motions splits the run."""
+        out = []
+        for event in events:
+            prev = out[-1] if out else None
+            if prev is not None and prev.type == event.type:
+                if event.type == pygame.MOUSEMOTION and prev.buttons == event.buttons:
+                    attrs = dict(event.dict)
+                    attrs["rel"] = (prev.rel[0] + event.rel[0], prev.rel[1] + event.rel[1])
+                    out[-1] = pygame.event.Event(pygame.MOUSEMOTION, attrs)
+                    self.coalesced += 1
+                    continue
+                if (event.type == pygame.MOUSEWHEEL
+                        and prev.dict.get("flipped") == event.dict.get("flipped")):
+                    attrs = dict(event.dict)
+                    attrs["x"] = prev.x + event.x
+                    attrs["y"] = prev.y + event.y
+                    for key in ("precise_x", "precise_y"):
+                        if key in attrs:
+                            attrs[key] = prev.dict.get(key, 0.0) + attrs[key]
+                    out[-1] = pygame.event.Event(pygame.MOUSEWHEEL, attrs)
+                    self.coalesced += 1
+                    continue
+            out.append(event)
+        return out
+
+    def route(self, event):
+        """Area a mouse event goes to (None for keyboard/other events)."""
+        if event.type in MOUSE_POS_EVENTS:
+            if self.capture is not None:
+                return self.capture
+            return self.regions.get_area_at_pos(event.pos)
+        if event.type == pygame.MOUSEWHEEL:
+            return self.regions.get_area_at_pos(pygame.mouse.get_pos())
+        return None
@@ -0,0 +1,175 @@
+# fonts.py
+import json
+import os
+import pygame
+from config import FONT_NAME, FONT_SIZE, FALLBACK_FONT_NAMES, FONT_PATH_CACHE
+
+PRIMARY = 0
+FALLBACK = 1
+DROP = 2  # caracteres que o SDL_ttf recusa (nulo, surrogates soltos)
+
+class FallbackFont:
+    """A primary font plus an optional emoji/fallback font behind the subset
+    of the pygame.font.Font interface the UI uses (render, size, heights).
+
+    Every code point is classified once (primary glyph, fallback glyph or
+    dropped) and cached, so mixed text is cut into runs and rendered run by
+    run without ever relying on render() raising. Pure ASCII text goes
+    straight to the primary font."""
+
+    def __init__(self, primary, fallback=None):
+        self.primary = primary
+        self.fallback = fallback
+        self._fonts = (primary, fallback or primary)
+        self._class = {}  # char -> PRIMARY / FALLBACK / DROP
+        self._classify("".join(chr(c) for c in range(0x20, 0x100)))
+
+    def _classify(self, chars):
+        chars = [ch for ch in dict.fromkeys(chars) if ch not in self._class]
+        if not chars:
+            return
+        # metrics() devolve None para o que a fonte não tem glifo
+        safe = [ch for ch in chars if ch != "\x00" and not "\ud800" <= ch <= "\udfff"]
+        for ch in chars:
+            self._class[ch] = DROP
+        if not safe:
+            return
+        primary = self.primary.metrics("".join(safe))
+        missing = [ch for ch, m in zip(safe, primary) if m is None]
+        for ch in safe:
+            self._class[ch] = PRIMARY  # sem glifo em lugar nenhum: caixinha da primária
+        if missing and self.fallback is not None:
+            for ch, m in zip(missing, self.fallback.metrics("".join(missing))):
+                if m is not None:
+                    self._class[ch] = FALLBACK
+
+    def runs(self, text):
+        """[(font, text)] runs of `text`; dropped chars are left out."""
+        if text.isascii() and "\x00" not in text:
+            return [(self.primary, text)]
+        classes = self._class
+        if any(ch not in classes for ch in text):
+            self._classify(text)
+        out = []
+        current, start = None, 0
+        for i, ch in enumerate(text):
+            kind = classes[ch]
+            if kind != current:
+                if current is not None and current != DROP:
+                    out.append((self._fonts[current], text[start:i]))
+                current, start = kind, i
+        if current is not None and current != DROP:
+            out.append((self._fonts[current], text[start:]))
+        return out
+
+    def size(self, text):
+        runs = self.runs(text)
+        if len(runs) == 1:
+            return runs[0][0].size(runs[0][1])
+        sizes = [font.size(part) for font, part in runs]
+        return sum(w for w, _ in sizes), max((h for _, h in sizes), default=self.primary.get_height())
+
+    def render(self, text, antialias, color, background=None):
+        runs = self.runs(text)
+        if not runs:
+            return self.primary.render("", antialias, color, background)
+        if len(runs) == 1:
+            return runs[0][0].render(runs[0][1], antialias, color, background)
+        # trechos lado a lado, alinhados pela linha de base
+        parts = [(font, font.render(part, antialias, color, background)) for font, part in runs]
+        ascent = max(font.get_ascent() for font, _ in parts)
+        height = max(ascent - font.get_ascent() + surf.get_height() for font, surf in parts)
+        out = pygame.Surface((sum(surf.get_width() for _, surf in parts), height), pygame.SRCALPHA)
+        if background is not None:
+            out.fill(background)
+        x = 0
+        for font, surf in parts:
+            out.blit(surf, (x, ascent - font.get_ascent()))
+            x += surf.get_width()
+        return out
+
+    def get_height(self):
+        if self.fallback is None:
+            return self.primary.get_height()
+        return max(self.primary.get_height(), self.fallback.get_height())
+
+    def get_linesize(self):
+        return self.primary.get_linesize()
+
+    def get_ascent(self):
+        return self.primary.get_ascent()
+
+    def get_descent(self):
+        return self.primary.get_descent()
+
+class FontManager:
+    """Loads each font once per size. Resolving a system font name
+    (pygame.font.match_font) scans every installed font, so resolved paths are
+    kept in FONT_PATH_CACHE and later startups open the files directly."""
+
+    def __init__(self, name=FONT_NAME, fallback_names=FALLBACK_FONT_NAMES, cache_path=FONT_PATH_CACHE):
+        self.name = name
+        self.fallback_names = fallback_names
+        self.cache_path = cache_path
+        self._paths = self._load_paths()
+        self._fonts = {}  # size -> FallbackFont
+
+    def _load_paths(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                paths = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # descarta caminhos de fontes que sumiram ("" = fonte padrão do pygame)
+        return {k: v for k, v in paths.items() if v == "" or os.path.exists(v)}
+
+    def _save_paths(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(self._paths, f)
+        except OSError:
+            pass  # sem cache em disco: só a próxima inicialização fica mais lenta
+
+    def resolve(self, name):
+        """Path of the system font `name`, or "" if it is not installed."""
+        path = self._paths.get(name)
+        if path is None:
+            path = pygame.font.match_font(name) or ""
+            self._paths[name] = path
+            self._save_paths()
+        return path
+
+    def _open(self, path, size):
+        try:
+            return pygame.font.Font(path or None, size)
+        except (OSError, pygame.error):
+            return None  # fonte só de bitmap sem esse tamanho, arquivo quebrado...
+
+    def get(self, size=FONT_SIZE):
+        font = self._fonts.get(size)
+        if font is None:
+            primary_path = self.resolve(self.name)
+            primary = self._open(primary_path, size) or pygame.font.Font(None, size)
+            fallback = None
+            for name in self.fallback_names:
+                path = self.resolve(name)
+                if path and path != primary_path:
+                    fallback = self._open(path, size)
+                    if fallback is not None:
+                        break
+            font = self._fonts[size] = FallbackFont(primary, fallback)
+        return font
+
+_manager = None
+
+def get_font(size=FONT_SIZE):
+    """Shared FallbackFont for `size` (FONT_NAME + the first available fallback)."""
+    global _manager
+    if _manager is None:
+        _manager = FontManager()
+    return _manager.get(size)
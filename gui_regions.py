@@ -1,50 +1,66 @@
 # gui_regions.py
 import pygame
-from config import MARGIN, SCROLLBAR_WIDTH
+
+HIGHLIGHT_COLOR = (255, 255, 0)
+
+def draw_outline(surface, color, rect, width):
+    """Same pixels as pygame.draw.rect(surface, color, rect, width), drawn as
+    four filled edges cut to the surface clip (edges outside it are skipped).
+    pygame.draw.rect fills the whole clip when it is only a few pixels wide,
+    which breaks the small dirty rects of the cursor blink."""
+    rect = pygame.Rect(rect)
+    clip = surface.get_clip()
+    inner_h = rect.height - 2 * width
+    for edge in ((rect.x, rect.y, rect.width, width),
+                 (rect.x, rect.bottom - width, rect.width, width),
+                 (rect.x, rect.y + width, width, inner_h),
+                 (rect.right - width, rect.y + width, width, inner_h)):
+        edge = clip.clip(edge)
+        if edge.width > 0 and edge.height > 0:
+            surface.fill(color, edge)
 
 class GUIRegions:
     def __init__(self, surface, chat_window, input_box):
         self.surface = surface
         self.chat_window = chat_window
         self.input_box = input_box
+        self.layout = chat_window.layout
+        self._last_active_area = None
         self.update_rects()
+        self.layout.subscribe(lambda layout: self.update_rects())
 
     def update_rects(self):
-        self.player_rect = pygame.Rect(
-            MARGIN, MARGIN,
-            self.surface.get_width() - 2 * MARGIN,
-            int(self.surface.get_height() * 0.1) - 2 * MARGIN
-        )
-        chat_rect = self.chat_window.get_chat_rect()
-        x = chat_rect.right + SCROLLBAR_WIDTH + MARGIN
-        width = self.surface.get_width() - x - MARGIN
-        self.game_rect = pygame.Rect(
-            x,
-            self.player_rect.bottom + MARGIN,
-            width,
-            int(self.surface.get_height() * 0.8) - 2 * MARGIN - (self.player_rect.bottom + MARGIN)
-        )
+        layout = self.layout
+        self.player_rect = layout.player
+        self.game_rect = layout.game
+        # tabela de hit-test: (rect, área) em ordem de prioridade; o chat
+        # inclui a barra de rolagem
+        self.hit_table = [
+            (layout.chat_area, 'chat'),
+            (layout.input, 'input'),
+            (layout.player, 'player'),
+            (layout.game, 'game'),
+        ]
 
     def get_area_at_pos(self, pos):
-        if self.chat_window.get_chat_rect().collidepoint(pos):
-            return 'chat'
-        if self.input_box.rect.collidepoint(pos):
-            return 'input'
-        if self.player_rect.collidepoint(pos):
-            return 'player'
-        if self.game_rect.collidepoint(pos):
-            return 'game'
+        for rect, area in self.hit_table:
+            if rect.collidepoint(pos):
+                return area
         return None
 
+    def get_area_rect(self, area):
+        return self.layout.area_rect(area)
+
+    def pop_dirty_rects(self, active_area):
+        """Rects whose focus highlight changed since the last call."""
+        if active_area == self._last_active_area:
+            return []
+        rects = [self.get_area_rect(a) for a in (self._last_active_area, active_area)]
+        self._last_active_area = active_area
+        return [r for r in rects if r is not None]
+
     def draw_active_highlight(self, active_area):
-        if active_area == 'chat':
-            rect = self.chat_window.get_chat_rect()
-        elif active_area == 'input':
-            rect = self.input_box.rect
-        elif active_area == 'player':
-            rect = self.player_rect
-        elif active_area == 'game':
-            rect = self.game_rect
-        else:
+        rect = self.get_area_rect(active_area)
+        if rect is None:
             return
-        pygame.draw.rect(self.surface, (255, 255, 0), rect, 3)
\ No newline at end of file
+        draw_outline(self.surface, HIGHLIGHT_COLOR, rect, 3)
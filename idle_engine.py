@@ -0,0 +1,200 @@
+# idle_engine.py
+import json
+import os
+import time
+from array import array
+from config import SIM_TICK, SIM_OFFLINE_CAP
+
+# recursos do jogo (índice = posição)
+RESOURCES = ("ouro", "gemas")
+
+# geradores: (nome, recurso produzido, produção por unidade/s, custo base em ouro, crescimento do custo)
+GENERATORS = (
+    ("Raposa coletora", 0, 0.5, 10.0, 1.15),
+    ("Toca", 0, 4.0, 120.0, 1.15),
+    ("Feira da floresta", 0, 30.0, 1500.0, 1.15),
+    ("Caravana", 0, 250.0, 20000.0, 1.15),
+    ("Mina de gemas", 1, 0.02, 50000.0, 1.25),
+)
+
+# melhorias: (nome, gerador afetado, multiplicador, custo em ouro)
+UPGRADES = (
+    ("Faro apurado", 0, 2.0, 100.0),
+    ("Tocas fundas", 1, 2.0, 1000.0),
+    ("Barracas novas", 2, 2.0, 15000.0),
+    ("Rotas seguras", 3, 2.0, 200000.0),
+    ("Picaretas de cristal", 4, 3.0, 500000.0),
+)
+
+class IdleEngine:
+    """Idle game simulation, independent of rendering.
+
+    State lives in flat array('d') tables indexed by resource / generator /
+    upgrade, so thousands of generators cost one pass when a purchase changes
+    the production rates, and nothing per frame. Time advances in fixed ticks
+    of `tick` seconds; between purchases the rates are constant, so n ticks
+    are applied in closed form (amount += rate * n * tick) whether n is one
+    frame's worth or hours of offline progress."""
+
+    def __init__(self, resources=RESOURCES, generators=GENERATORS, upgrades=UPGRADES, tick=SIM_TICK):
+        self.resource_names = list(resources)
+        self.amounts = array('d', bytes(8 * len(resources)))
+        self.earned = array('d', bytes(8 * len(resources)))  # total produzido
+        self.gen_names = [g[0] for g in generators]
+        self.gen_resource = array('H', (g[1] for g in generators))
+        self.gen_rate = array('d', (g[2] for g in generators))
+        self.gen_base_cost = array('d', (g[3] for g in generators))
+        self.gen_growth = array('d', (g[4] for g in generators))
+        self.gen_count = array('q', bytes(8 * len(generators)))
+        self.gen_mult = array('d', [1.0] * len(generators))
+        self.upg_names = [u[0] for u in upgrades]
+        self.upg_target = array('H', (u[1] for u in upgrades))
+        self.upg_factor = array('d', (u[2] for u in upgrades))
+        self.upg_cost = array('d', (u[3] for u in upgrades))
+        self.upg_bought = array('b', bytes(len(upgrades)))
+        self.tick = tick
+        self.ticks = 0  # ticks simulados desde o começo do jogo
+        self._acc = 0.0  # tempo acumulado que ainda não fecha um tick
+        self._rates = None
+        self.version = 0  # muda a cada compra (taxas, custos)
+        if generators:
+            self.gen_count[0] = 1  # começa com uma raposa
+
+    @property
+    def elapsed(self):
+        """Simulated play time in seconds."""
+        return self.ticks * self.tick
+
+    def rates(self):
+        """Production per second of each resource (cached until a purchase)."""
+        if self._rates is None:
+            rates = array('d', bytes(8 * len(self.amounts)))
+            for res, rate, count, mult in zip(self.gen_resource, self.gen_rate, self.gen_count, self.gen_mult):
+                if count:
+                    rates[res] += rate * count * mult
+            self._rates = rates
+        return self._rates
+
+    def step(self, ticks):
+        """Advance `ticks` fixed ticks at once."""
+        if ticks <= 0:
+            return
+        seconds = ticks * self.tick
+        for r, rate in enumerate(self.rates()):
+            if rate:
+                self.amounts[r] += rate * seconds
+                self.earned[r] += rate * seconds
+        self.ticks += ticks
+
+    def update(self, dt):
+        """Feed `dt` seconds of wall time; runs the whole ticks it completes.
+        Returns the number of ticks."""
+        self._acc += dt
+        ticks = int(self._acc / self.tick)
+        if ticks:
+            self._acc -= ticks * self.tick
+            self.step(ticks)
+        return ticks
+
+    def catch_up(self, seconds):
+        """Offline progress: credit up to SIM_OFFLINE_CAP seconds in one step.
+        Returns (seconds credited, gain of each resource)."""
+        seconds = max(0.0, min(seconds, SIM_OFFLINE_CAP))
+        before = array('d', self.amounts)
+        self.update(seconds)
+        return seconds, [after - b for after, b in zip(self.amounts, before)]
+
+    def generator_cost(self, i):
+        return self.gen_base_cost[i] * self.gen_growth[i] ** self.gen_count[i]
+
+    def buy_generator(self, i):
+        """Buy one generator `i` with gold. Returns False if unaffordable."""
+        cost = self.generator_cost(i)
+        if self.amounts[0] < cost:
+            return False
+        self.amounts[0] -= cost
+        self.gen_count[i] += 1
+        self._changed()
+        return True
+
+    def buy_upgrade(self, j):
+        if self.upg_bought[j] or self.amounts[0] < self.upg_cost[j]:
+            return False
+        self.amounts[0] -= self.upg_cost[j]
+        self.upg_bought[j] = 1
+        self.gen_mult[self.upg_target[j]] *= self.upg_factor[j]
+        self._changed()
+        return True
+
+    def next_upgrade(self):
+        """Cheapest upgrade not bought yet, or None."""
+        left = [j for j, bought in enumerate(self.upg_bought) if not bought]
+        return min(left, key=self.upg_cost.__getitem__, default=None)
+
+    def _changed(self):
+        self._rates = None
+        self.version += 1
+
+    def to_dict(self):
+        return {
+            "saved_at": time.time(),
+            "ticks": self.ticks,
+            "amounts": list(self.amounts),
+            "earned": list(self.earned),
+            "generators": dict(zip(self.gen_names, self.gen_count)),
+            "upgrades": [name for name, bought in zip(self.upg_names, self.upg_bought) if bought],
+        }
+
+    def load_dict(self, data):
+        """Restore a save; generators/upgrades are matched by name so the
+        catalog can grow between versions. Returns the save timestamp."""
+        self.ticks = int(data.get("ticks", 0))
+        for table, key in ((self.amounts, "amounts"), (self.earned, "earned")):
+            for r, value in enumerate(data.get(key, [])[:len(table)]):
+                table[r] = float(value)
+        counts = data.get("generators", {})
+        for i, name in enumerate(self.gen_names):
+            self.gen_count[i] = int(counts.get(name, self.gen_count[i]))
+        bought = set(data.get("upgrades", []))
+        for j, name in enumerate(self.upg_names):
+            if name in bought and not self.upg_bought[j]:
+                self.upg_bought[j] = 1
+                self.gen_mult[self.upg_target[j]] *= self.upg_factor[j]
+        self._changed()
+        return float(data.get("saved_at", time.time()))
+
+    def save(self, path):
+        """Write the state atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        """Load a save if there is one; returns the seconds since it was
+        written (0.0 without a save)."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0.0
+        return max(0.0, time.time() - self.load_dict(data))
+
+def format_amount(value):
+    """Short number for the panels: 950, 12.3K, 4.56M..."""
+    if value < 999.5:
+        return f"{value:.0f}" if value >= 10 or value == int(value) else f"{value:.1f}"
+    for suffix in ("K", "M", "B", "T", "Qa"):
+        value /= 1000.0
+        if value < 999.5:
+            return f"{value:.3g}{suffix}"
+    return f"{value / 1000.0:.0f}Qi"
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s" if minutes else f"{secs}s"
@@ -0,0 +1,104 @@
+# info_panels.py
+import pygame
+from config import FONT_SIZE, MARGIN, INFO_REFRESH_INTERVAL
+from idle_engine import format_amount, format_duration
+
+INFO_COLOR = (220, 220, 220)
+
+class InfoPanels:
+    """Values of the idle game in the "Informações do Jogador" and
+    "Informações do Jogo" areas, below their titles.
+
+    The texts are rebuilt from the engine every INFO_REFRESH_INTERVAL
+    seconds, and a line is only re-rendered (and its rect reported dirty)
+    when its text changed. While the game is active (area 'game'), keys 1-9
+    buy a generator and U the cheapest upgrade."""
+
+    def __init__(self, surface, layout, engine, font):
+        self.surface = surface
+        self.layout = layout
+        self.engine = engine
+        self.font = font
+        self.line_height = FONT_SIZE + 5
+        self._timer = INFO_REFRESH_INTERVAL
+        self._lines = {"player": [], "game": []}  # área -> [(texto, superfície)]
+        self._dirty_rects = []
+        self.refresh(force=True)
+        layout.subscribe(lambda layout: self.refresh(force=True))
+
+    def _texts(self):
+        engine = self.engine
+        rates = engine.rates()
+        player = [f"Tempo de jogo: {format_duration(engine.elapsed)}   "
+                  f"Total: {format_amount(engine.earned[0])} {engine.resource_names[0]}"]
+        game = [f"{name.capitalize()}: {format_amount(amount)} (+{format_amount(rate)}/s)"
+                for name, amount, rate in zip(engine.resource_names, engine.amounts, rates)]
+        for i, name in enumerate(engine.gen_names[:9]):
+            game.append(f"[{i + 1}] {name} x{engine.gen_count[i]} - {format_amount(engine.generator_cost(i))}")
+        j = engine.next_upgrade()
+        if j is not None:
+            game.append(f"[U] {engine.upg_names[j]} - {format_amount(engine.upg_cost[j])}")
+        return {"player": player, "game": game}
+
+    def _line_rect(self, area, row):
+        rect = self.layout.area_rect(area)
+        # linha 0 é o título, desenhado pela StaticLayer
+        line = pygame.Rect(rect.x + MARGIN, rect.y + MARGIN + (row + 1) * self.line_height,
+                           rect.width - 2 * MARGIN, self.line_height)
+        return line.clip(rect)
+
+    def refresh(self, force=False):
+        """Re-read the engine; re-render only the lines whose text changed."""
+        for area, texts in self._texts().items():
+            old = self._lines[area]
+            new = []
+            for row, text in enumerate(texts):
+                line_rect = self._line_rect(area, row)
+                if line_rect.height < self.font.get_height():
+                    break  # não cabe na área
+                if not force and row < len(old) and old[row][0] == text:
+                    new.append(old[row])
+                    continue
+                new.append((text, self.font.render(text, True, INFO_COLOR)))
+                self._dirty_rects.append(line_rect)
+            for row in range(len(new), len(old)):
+                self._dirty_rects.append(self._line_rect(area, row))  # linha que sumiu
+            self._lines[area] = new
+
+    def process_event(self, event):
+        """Purchase keys; returns True if something was bought."""
+        if event.type != pygame.KEYDOWN:
+            return False
+        engine = self.engine
+        if pygame.K_1 <= event.key <= pygame.K_9 and event.key - pygame.K_1 < len(engine.gen_names):
+            bought = engine.buy_generator(event.key - pygame.K_1)
+        elif event.key == pygame.K_u and engine.next_upgrade() is not None:
+            bought = engine.buy_upgrade(engine.next_upgrade())
+        else:
+            return False
+        if bought:
+            self.refresh()
+        return bought
+
+    def next_timer(self):
+        """Seconds until the next refresh, or None if nothing is producing."""
+        if not any(self.engine.rates()):
+            return None
+        return max(0.0, self._timer)
+
+    def update(self, dt):
+        self._timer -= dt
+        if self._timer <= 0:
+            self._timer = INFO_REFRESH_INTERVAL
+            self.refresh()
+
+    def pop_dirty_rects(self):
+        rects = self._dirty_rects
+        self._dirty_rects = []
+        return rects
+
+    def draw(self, font):
+        for area, lines in self._lines.items():
+            for row, (_, surf) in enumerate(lines):
+                rect = self._line_rect(area, row)
+                self.surface.blit(surf, rect.topleft, pygame.Rect((0, 0), rect.size))
@@ -1,22 +1,90 @@
 # input_box.py
+from bisect import bisect_left, bisect_right
+import time
 import pygame
-import pyperclip
 from config import (
-    FONT_NAME, FONT_SIZE, MARGIN, SEND_BUTTON_WIDTH, SEND_BUTTON_HEIGHT,
-    SCROLLBAR_WIDTH, BLACK, BORDER_COLOR
+    FONT_SIZE, MARGIN, BLACK, WHITE, CURSOR_WIDTH, PASTE_CHUNK_CHARS, RELAYOUT_BUDGET, RELAYOUT_SCAN
 )
 from scrollable_panel import ScrollablePanel
-from chat_window import ChatWindow  # Adicionado para acesso a get_game_info_rect
+from render_cache import shared_render_cache
+from text_wrap import get_width_cache, iter_spans, wrap_spans
+from text_buffer import Rope
+from clipboard import Clipboard
+from fonts import get_font
+from gui_regions import HIGHLIGHT_COLOR, draw_outline
+from chat_window import ChatWindow  # Adicionado para acesso ao layout
+from message_store import LineIndex
+
+# caracteres lidos do buffer por vez ao re-quebrar um parágrafo
+_TEXT_WINDOW = 2048
+
+class _InputRows:
+    """Read-only view of the wrapped rows of an InputBox: row texts, or
+    (text, WHITE) lines for the panel. Rows are cut from the buffer on
+    access, so an edit never rebuilds or shifts a list of all rows."""
+
+    def __init__(self, box, colored=False):
+        self.box = box
+        self.colored = colored
+
+    def __len__(self):
+        return self.box._row_index.total
+
+    def _texts(self, start, stop):
+        box = self.box
+        index = box._row_index
+        out = []
+        p = index.find(start)
+        r = start - index.start(p)
+        while len(out) < stop - start:
+            rows = box._para_rows[p][r:r + stop - start - len(out)]
+            base = box.buffer.line_start(p)
+            first = rows[0][0]
+            chunk = box.buffer.text(base + first, base + rows[-1][1])
+            out.extend(chunk[a - first:b - first] for a, b in rows)
+            p += 1
+            r = 0
+        return out
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            texts = self._texts(start, stop) if start < stop else []
+        else:
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError(key)
+            texts = self._texts(key, key + 1)
+        if self.colored:
+            texts = [(t, WHITE) for t in texts]
+        return texts if isinstance(key, slice) else texts[0]
 
 class InputBox:
-    def __init__(self, surface, chat_window):
+    def __init__(self, surface, chat_window, clipboard=None):
         self.surface = surface
         self.chat_window = chat_window  # Referência para calcular o y correto
-        self.font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+        self.font = get_font(FONT_SIZE)
+        self.width_cache = get_width_cache(self.font)
         self.line_height = FONT_SIZE + 6
+        # buffer holds the logical text (paragraphs separated by '\n')
+        self.buffer = Rope()
+        # visual-line index derived from the buffer:
+        # _para_rows[p] = (start, end) spans of the wrapped rows of paragraph p,
+        # _row_index = row count per paragraph (Fenwick: first row / paragraph at a row),
+        # _para_todo[p] = first provisional row of p (None: all rows final)
+        self._para_rows = [[(0, 0)]]
+        self._row_index = LineIndex.ones(1)
+        self._para_todo = [None]
+        self._todo_count = 0  # parágrafos com linhas provisórias
+        self._rewrap_pos = 0  # próximos parágrafos a checar em _rewrap_slice
+        self._wrapped_width = None  # largura das quebras atuais
         # text_lines represents the visible lines (including wrapped lines)
-        self.text_lines = ['']
-        # cursor: line index and column index within that line
+        self.text_lines = _InputRows(self)
+        self._panel_rows = _InputRows(self, colored=True)
+        # cursor: buffer offset (source of truth) and the line index and
+        # column index within that visual line where it is drawn
+        self.cursor_offset = 0
         self.cursor_line = 0
         self.cursor_col = 0
 
@@ -25,142 +93,418 @@ class InputBox:
         self.cursor_interval = 0.5
         self.active = True  # start active for convenience
 
+        # clipboard fora da thread de desenho; colagens grandes entram em pedaços
+        self.clipboard = clipboard if clipboard is not None else Clipboard()
+        self._paste_text = ""
+        self._paste_pos = 0
+
         self.panel = None
+        self._dirty_rects = []
+        self.layout = chat_window.layout
         self.update_rects()
+        self.layout.subscribe(lambda layout: self.update_rects())
 
     def get_input_rect(self):
-        # Posiciona a input com 5 pixels de margem acima, após o fim da região game_info
-        game_info_bottom = self.chat_window.get_game_info_rect().bottom
-        y = game_info_bottom + MARGIN  # Margem de 5 pixels acima da input
-        height = int(self.surface.get_height() * 0.12) - 2 * MARGIN  # Ajusta altura com margens internas
-        width = self.surface.get_width() - 2 * MARGIN
-        return pygame.Rect(MARGIN, y, width, height)
+        # abaixo da região game_info, calculado pelo Layout compartilhado
+        return self.layout.input
 
     def update_rects(self):
-        self.rect = self.get_input_rect()
-
-        total_text_width = self.rect.width - SEND_BUTTON_WIDTH - 4 * MARGIN
-        self.text_panel_rect = pygame.Rect(
-            self.rect.x + MARGIN,
-            self.rect.y + MARGIN,
-            total_text_width - SCROLLBAR_WIDTH,
-            self.rect.height - 2 * MARGIN
-        )
-        self.scrollbar_rect = pygame.Rect(
-            self.text_panel_rect.right + MARGIN,
-            self.rect.y + MARGIN,
-            SCROLLBAR_WIDTH,
-            self.rect.height - 2 * MARGIN
-        )
-        self.send_button_rect = pygame.Rect(
-            self.rect.x + self.rect.width - SEND_BUTTON_WIDTH - MARGIN,
-            self.rect.y + (self.rect.height - SEND_BUTTON_HEIGHT) // 2,
-            SEND_BUTTON_WIDTH, SEND_BUTTON_HEIGHT
-        )
+        layout = self.layout
+        self.rect = layout.input
+        self.text_panel_rect = layout.input_text
+        self.scrollbar_rect = layout.input_scrollbar
+        self.send_button_rect = layout.send_button
 
         if self.panel is None:
-            self.panel = ScrollablePanel(self.text_panel_rect, self.line_height)
+            self.panel = ScrollablePanel(self.text_panel_rect, self.line_height, shared_render_cache)
+            self.panel.draw_track = False  # trilho na camada estática
+            self._wrapped_width = self._wrap_width()
+            self._sync_panel_lines()
         else:
             self.panel.set_rect(self.text_panel_rect)
-            self._sync_panel_lines(keep_scroll=True)
+            if self._wrap_width() != self._wrapped_width:
+                self._relayout()
+            self._set_cursor_offset(self.cursor_offset)
+            self._sync_panel_lines()
+
+    def mark_dirty(self, rect=None):
+        """Report a changed rect to the dirty-rect renderer (None = whole input area)."""
+        self._dirty_rects.append(pygame.Rect(self.rect if rect is None else rect))
+
+    def pop_dirty_rects(self):
+        rects = self._dirty_rects
+        self._dirty_rects = []
+        return rects
+
+    def _cursor_x(self):
+        """Pixel x of the cursor inside its line, from the line's cached
+        character positions (no font.size call while moving along a row)."""
+        return self.width_cache.prefix_widths(self.text_lines[self.cursor_line])[self.cursor_col]
+
+    def _cursor_rect(self):
+        """Screen rect of the cursor overlay, or None if its line is scrolled out."""
+        row = self._cursor_absolute_index() - self.panel.scroll
+        if row < 0 or row >= self.panel.visible_lines_count():
+            return None
+        inner = self.text_panel_rect.inflate(-2 * MARGIN, -2 * MARGIN)
+        x = min(inner.x + self._cursor_x(), inner.right - CURSOR_WIDTH)
+        height = min(self.font.get_height(), self.line_height)
+        return pygame.Rect(x, inner.y + row * self.line_height, CURSOR_WIDTH, height).clip(inner)
 
-    def _sync_panel_lines(self, keep_scroll=False):
-        arr = [(ln, (255, 255, 255)) for ln in self.text_lines]
-        self.panel.set_lines(arr)
-        if keep_scroll:
-            self.panel._ensure_scroll_bounds()
+    def _sync_panel_lines(self):
+        self.panel.set_line_source(self._panel_rows)
+        self.mark_dirty()
 
     def _cursor_absolute_index(self):
         return self.cursor_line
 
     def _auto_scroll_to_cursor(self):
         self.panel.ensure_line_visible(self._cursor_absolute_index())
-
-    def _reflow_from(self, start_idx=0):
-        """Reflow wrapping starting from start_idx. Uses pixel width from font and text_panel_rect width."""
-        max_w = max(4, self.text_panel_rect.width)
-        i = start_idx
-        while i < len(self.text_lines):
-            line = self.text_lines[i]
-            # if fits, advance
-            if self.font.size(line)[0] <= max_w:
-                i += 1
+        self.mark_dirty()
+
+    def _wrap_width(self):
+        # largura interna do painel, reservando espaço para o cursor no fim da linha
+        return max(4, self.text_panel_rect.width - 2 * MARGIN - CURSOR_WIDTH)
+
+    def _wrap_paragraph(self, text):
+        return wrap_spans(text, self._wrap_width(), self.width_cache)
+
+    def _rewrap_paragraphs(self, p, old_count, new_count, edit=None):
+        """Replace the visual rows of paragraphs p..p+old_count-1 by the rows of
+        the new_count paragraphs now at p in the buffer. Rows of other paragraphs
+        are left alone; their offsets live in the Fenwick row index.
+
+        `edit` = (col, old_end, new_end) says the edit starts at column col of
+        paragraph p and that the text after column old_end of the last old
+        paragraph is now after column new_end of the last new one. Greedy
+        wrapping only changes rows from the one before the edit, so wrapping
+        starts there and stops as soon as a row starts where an old row did in
+        the unchanged tail: from there on the rows are the old ones, shifted.
+        If that takes more than a screen of rows past the edit, the rest of the
+        paragraph keeps the old rows as provisional ones and _rewrap_slice
+        finishes it in later frames."""
+        old_paras = self._para_rows[p:p + old_count]
+        old_todo = self._para_todo[p:p + old_count]
+        cap = self.panel.visible_lines_count() + 1
+        para_rows, para_todo = [], []
+        for k in range(new_count):
+            rows, pos, todo = [], 0, None
+            if edit is not None and k == 0:
+                old = old_paras[0]
+                head = max(0, bisect_right(old, (edit[0], float("inf"))) - 2)
+                rows, pos = old[:head], old[head][0]
+                if old_todo[0] is not None and old_todo[0] < head:
+                    todo = old_todo[0]
+            last = edit is not None and k == new_count - 1
+            if last:
+                old = old_paras[-1]
+                shift = edit[2] - edit[1]
+                # linhas provisórias não servem para ressincronizar
+                lim = len(old) if old_todo[-1] is None else old_todo[-1]
+                lim_pos = old[lim][0] + shift if lim < len(old) else float("inf")
+                after = 0
+            for a, b in self._iter_rows(p + k, pos):
+                if last and a >= edit[2]:
+                    j = bisect_left(old, (a - shift,), 0, lim)
+                    if j < lim and old[j][0] == a - shift:
+                        # resto igual ao antigo: só desloca
+                        if todo is None and old_todo[-1] is not None:
+                            todo = len(rows) + old_todo[-1] - j
+                        rows.extend((x + shift, y + shift) for x, y in old[j:])
+                        break
+                    if after > cap or a >= lim_pos:
+                        # a parte visível já está quebrada; o resto fica para update()
+                        if todo is None:
+                            todo = len(rows)
+                        self._provisional_rows(p + k, rows, a, old, shift)
+                        break
+                    after += 1
+                rows.append((a, b))
+            para_rows.append(rows)
+            para_todo.append(todo)
+
+        self._para_rows[p:p + old_count] = para_rows
+        self._para_todo[p:p + old_count] = para_todo
+        self._todo_count += (sum(t is not None for t in para_todo)
+                             - sum(t is not None for t in old_todo))
+        if old_count == new_count == 1:
+            self._row_index.set(p, len(para_rows[0]))
+        else:
+            self._row_index.splice(p, old_count, [len(rows) for rows in para_rows])
+        self.panel._ensure_scroll_bounds()
+        self.mark_dirty()
+
+    def _iter_rows(self, p, pos):
+        """iter_spans over paragraph p from the row that starts at `pos`,
+        reading the buffer _TEXT_WINDOW chars at a time instead of the whole
+        paragraph. A row that reaches the end of a window may go on after it,
+        so the next window starts at that row."""
+        base = self.buffer.line_start(p)
+        length = self.buffer.line_end(p) - base
+        max_w = self._wrap_width()
+        window, skip = _TEXT_WINDOW, False
+        while True:
+            end = min(length, pos + window)
+            text = self.buffer.text(base + pos, base + end)
+            if skip:
+                # a janela anterior acabou nos espaços de uma quebra
+                n = len(text) - len(text.lstrip())
+                pos += n
+                if n == len(text) and end < length:
+                    continue
+                text, skip = text[n:], False
+            for a, b in iter_spans(text, max_w, self.width_cache):
+                if end < length and b == len(text):
+                    break
+                yield pos + a, pos + b
+            else:
+                return
+            if a == 0:
+                window *= 2  # uma linha só ocupou a janela toda
+            else:
+                pos += a
+                skip = a == len(text)
+
+    def _provisional_rows(self, p, rows, a, old, shift):
+        """Append rows for paragraph p from column a (where a row starts)
+        without wrapping it: the `old` rows (shifted by `shift`) from the first
+        that starts at or after a, and the text before that one as one row."""
+        j = bisect_left(old, (a - shift,))
+        if j < len(old):
+            end = old[j][0] + shift
+        else:
+            end = self.buffer.line_end(p) - self.buffer.line_start(p)
+        if end > a:
+            base = self.buffer.line_start(p)
+            rows.append((a, a + len(self.buffer.text(base + a, base + end).rstrip())))
+        rows.extend((x + shift, y + shift) for x, y in old[j:])
+
+    def _rewrap_tail(self, p, deadline):
+        """Wrap the provisional rows of paragraph p until `deadline`."""
+        rows = self._para_rows[p]
+        t = self._para_todo[p]
+        new, todo = rows[:t], None
+        for a, b in self._iter_rows(p, rows[t][0]):
+            if len(new) > t and time.perf_counter() >= deadline:
+                todo = len(new)
+                self._provisional_rows(p, new, a, rows, 0)
+                break
+            new.append((a, b))
+        self._para_rows[p] = new
+        self._para_todo[p] = todo
+        if todo is None:
+            self._todo_count -= 1
+        self._row_index.set(p, len(new))
+
+    def _relayout(self):
+        """After a width change: every row becomes provisional. The visible
+        rows are wrapped at the new width now; whole paragraphs are re-wrapped
+        by _rewrap_slice, the cursor's and the visible ones first."""
+        self._wrapped_width = self._wrap_width()
+        self._para_todo = [0] * len(self._para_rows)
+        self._todo_count = len(self._para_rows)
+        self._rewrap_pos = self._row_index.find(self.panel.scroll)
+        self._wrap_viewport()
+        self._rewrap_slice()
+
+    def _wrap_viewport(self):
+        """Wrap the provisional rows on screen from the top visible one, so
+        none is drawn at the old width; they stay provisional."""
+        index = self._row_index
+        row = self.panel.scroll
+        stop = row + self.panel.visible_lines_count() + 1
+        while row < min(stop, index.total):
+            p = index.find(row)
+            rows, t = self._para_rows[p], self._para_todo[p]
+            r = row - index.start(p)
+            if t is None or r < t:
+                # linhas finais: pula até as provisórias
+                row = index.start(p) + (len(rows) if t is None else t)
                 continue
-            # find overflow position: smallest j such that width(line[:j]) > max_w
-            j = 1
-            L = len(line)
-            while j <= L and self.font.size(line[:j])[0] <= max_w:
-                j += 1
-            overflow_pos = j - 1
-            # try to break at last space before overflow_pos
-            split_at = None
-            for k in range(overflow_pos, 0, -1):
-                if line[k-1] == ' ':
-                    split_at = k
+            new = rows[:r]
+            for a, b in self._iter_rows(p, rows[r][0]):
+                if len(new) - r >= stop - row:
+                    self._provisional_rows(p, new, a, rows, 0)
                     break
-            if split_at is None:
-                split_at = overflow_pos
-            left = line[:split_at].rstrip()
-            right = line[split_at:].lstrip()
-            self.text_lines[i] = left
-            self.text_lines.insert(i+1, right)
-            # adjust cursor
-            if self.cursor_line == i:
-                if self.cursor_col > len(left):
-                    self.cursor_line += 1
-                    self.cursor_col -= len(left)
-            elif self.cursor_line > i:
-                self.cursor_line += 1
-            # continue checking the new right part in next iteration
-            i += 1
+                new.append((a, b))
+            row = stop if len(new) - r >= stop - row else index.start(p) + len(new)
+            self._para_rows[p] = new
+            index.set(p, len(new))
+
+    def _next_todo(self):
+        """Paragraph to re-wrap next: the cursor's, then the visible ones,
+        then the others in order."""
+        todo = self._para_todo
+        p = self.buffer.line_of(self.cursor_offset)
+        if todo[p] is not None:
+            return p
+        index, panel = self._row_index, self.panel
+        last = min(index.total, panel.scroll + panel.visible_lines_count()) - 1
+        for p in range(index.find(panel.scroll), index.find(last) + 1):
+            if todo[p] is not None:
+                return p
+        for _ in range(min(len(todo), RELAYOUT_SCAN)):
+            p = self._rewrap_pos % len(todo)
+            if todo[p] is not None:
+                return p
+            self._rewrap_pos = p + 1
+        return None
+
+    def _rewrap_slice(self, budget=RELAYOUT_BUDGET):
+        """Re-wrap provisional rows for at most `budget` seconds. The top
+        visible row keeps its text, and the cursor stays in view if it was."""
+        panel = self.panel
+        top = self._row_offset(panel.scroll)
+        shown = 0 <= self.cursor_line - panel.scroll < panel.visible_lines_count()
+        deadline = time.perf_counter() + budget
+        changed = False
+        while self._todo_count:
+            p = self._next_todo()
+            if p is None:
+                break
+            self._rewrap_tail(p, deadline)
+            changed = True
+            if time.perf_counter() >= deadline:
+                break
+        if changed:
+            self._set_cursor_offset(self.cursor_offset)
+            panel.scroll = self._locate(top)[0]
+            panel._ensure_scroll_bounds()
+            if shown:
+                panel.ensure_line_visible(self.cursor_line)
+            self.mark_dirty()
 
     def _reflow_all(self):
-        # Reflow entire buffer (used after paste or big edits)
-        # We'll re-merge and then re-wrap paragraphs separated by explicit newlines
-        paragraphs = "\n".join(self.text_lines).split("\n")
-        self.text_lines = []
-        for p in paragraphs:
-            # break paragraph into wrapped lines
-            cur = p
-            if cur == "":
-                self.text_lines.append("")
-                continue
-            while True:
-                if self.font.size(cur)[0] <= self.text_panel_rect.width:
-                    self.text_lines.append(cur)
-                    break
-                # find split
-                j = 1
-                L = len(cur)
-                while j <= L and self.font.size(cur[:j])[0] <= self.text_panel_rect.width:
-                    j += 1
-                overflow_pos = j - 1
-                split_at = None
-                for k in range(overflow_pos, 0, -1):
-                    if cur[k-1] == ' ':
-                        split_at = k
-                        break
-                if split_at is None:
-                    split_at = overflow_pos
-                left = cur[:split_at].rstrip()
-                right = cur[split_at:].lstrip()
-                self.text_lines.append(left)
-                cur = right
+        # Reflow entire buffer at once (used after a reset): re-wrap every paragraph
+        self._para_rows = [self._wrap_paragraph(self.buffer.line_text(p))
+                           for p in range(self.buffer.line_count())]
+        self._para_todo = [None] * len(self._para_rows)
+        self._todo_count = 0
+        self._row_index = LineIndex()
+        self._row_index.splice(0, 0, [len(rows) for rows in self._para_rows])
+        self._wrapped_width = self._wrap_width()
+
+    def _row_offset(self, row):
+        """Buffer offset where visual row `row` starts."""
+        index = self._row_index
+        p = index.find(row)
+        rows = self._para_rows[p]
+        return self.buffer.line_start(p) + rows[min(row - index.start(p), len(rows) - 1)][0]
+
+    def _locate(self, offset):
+        """Visual (row, col) of buffer offset `offset`. An offset inside the
+        spaces dropped at a wrap is placed at the row end."""
+        p = self.buffer.line_of(offset)
+        col = offset - self.buffer.line_start(p)
+        rows = self._para_rows[p]
+        r = max(0, bisect_right(rows, (col, float("inf"))) - 1)
+        start, end = rows[r]
+        return self._row_index.start(p) + r, max(0, min(col - start, end - start))
+
+    def _visual_to_offset(self):
+        """Buffer offset of the visual position (cursor_line, cursor_col)."""
+        index = self._row_index
+        p = index.find(self.cursor_line)
+        start, end = self._para_rows[p][self.cursor_line - index.start(p)]
+        return self.buffer.line_start(p) + start + min(self.cursor_col, end - start)
+
+    def _cursor_offset(self):
+        return self.cursor_offset
+
+    def _cursor_from_visual(self):
+        """Apply a visual move (cursor_line/cursor_col) to the buffer offset."""
+        self._set_cursor_offset(self._visual_to_offset())
+
+    def _set_cursor_offset(self, offset):
+        """Move the cursor to buffer offset `offset` and place it visually. An
+        offset inside the spaces dropped at a wrap is drawn at the row end."""
+        offset = max(0, min(offset, len(self.buffer)))
+        self.cursor_offset = offset
+        self.cursor_line, self.cursor_col = self._locate(offset)
+
+    def _insert_text(self, text):
+        offset = self._cursor_offset()
+        p = self.buffer.line_of(offset)
+        col = offset - self.buffer.line_start(p)
+        newlines = text.count("\n")
+        # o texto depois do cursor termina na coluna new_end do último parágrafo novo
+        new_end = col + len(text) if not newlines else len(text) - text.rfind("\n") - 1
+        self.buffer.insert(offset, text)
+        self._rewrap_paragraphs(p, 1, 1 + newlines, (col, col, new_end))
+        self._set_cursor_offset(offset + len(text))
+        self._auto_scroll_to_cursor()
+
+    def _delete_range(self, start, end):
+        start = max(0, start)
+        end = min(end, len(self.buffer))
+        if start >= end:
+            return
+        p = self.buffer.line_of(start)
+        merged = self.buffer.text(start, end).count("\n")
+        col = start - self.buffer.line_start(p)
+        old_end = end - self.buffer.line_start(p + merged)
+        self.buffer.delete(start, end)
+        self._rewrap_paragraphs(p, 1 + merged, 1, (col, old_end, col))
+        self._set_cursor_offset(start)
+        self._auto_scroll_to_cursor()
+
+    def _paste_pending(self):
+        return self._paste_pos < len(self._paste_text)
+
+    def _queue_paste(self, text):
+        text = text.replace("\r\n", "\n")
+        if text:
+            self._paste_text = self._paste_text[self._paste_pos:] + text
+            self._paste_pos = 0
+
+    def _paste_chunk(self, limit=PASTE_CHUNK_CHARS):
+        """Insert the next part of a pending paste, cut after a newline (or a
+        space) when possible. Each chunk only re-wraps the rows from the
+        insertion point until the old breaks line up again, so a long paste
+        without newlines costs the same per frame as one with them."""
+        text, pos = self._paste_text, self._paste_pos
+        end = len(text)
+        if end - pos > limit:
+            end = pos + limit
+            cut = text.rfind("\n", pos, end)
+            if cut < 0:
+                cut = text.rfind(" ", pos, end)
+            if cut >= pos:
+                end = cut + 1
+        self._insert_text(text[pos:end])
+        self._paste_pos = end
+        if end >= len(text):
+            self._paste_text = ""
+            self._paste_pos = 0
+
+    def _flush_paste(self):
+        # antes de outra edição: termina a colagem para manter a ordem do texto
+        if self._paste_pending():
+            self._paste_chunk(len(self._paste_text))
+
+    def _take_text(self):
+        """Return the whole logical text and reset the buffer."""
+        self._flush_paste()
+        text = self.buffer.text()
+        self.buffer = Rope()
+        self._reflow_all()
+        self.cursor_offset = 0
+        self.cursor_line = 0
+        self.cursor_col = 0
+        self._sync_panel_lines()
+        return text
 
     def process_event(self, event):
         # click send button
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.send_button_rect.collidepoint(event.pos):
-                text = "\n".join(self.text_lines)
-                # reset
-                self.text_lines = ['']
-                self.cursor_line = 0
-                self.cursor_col = 0
-                self._sync_panel_lines()
-                return text
+                return self._take_text()
 
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            self.active = self.rect.collidepoint(event.pos)
+            active = self.rect.collidepoint(event.pos)
+            if active != self.active:
+                self.active = active
+                self.mark_dirty()
             # forward to panel if clicking scrollbar/handle
             if self.panel:
                 bar, handle = self.panel._scrollbar_rects()
@@ -170,11 +514,17 @@ class InputBox:
 
         if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
             if self.panel and self.panel.dragging:
+                old_scroll = self.panel.scroll
                 self.panel.process_event(event)
+                if self.panel.scroll != old_scroll:
+                    self.mark_dirty()
 
         if event.type == pygame.MOUSEWHEEL:
             if self.text_panel_rect.collidepoint(pygame.mouse.get_pos()) or self.panel.dragging:
+                old_scroll = self.panel.scroll
                 self.panel.process_event(event)
+                if self.panel.scroll != old_scroll:
+                    self.mark_dirty()
             return None
 
         if not self.active:
@@ -182,171 +532,111 @@ class InputBox:
 
         # KEY INPUT
         if event.type == pygame.KEYDOWN:
-            mods = pygame.key.get_mods()
+            mods = event.mod  # modificadores no momento da tecla (não o estado atual)
+            self._flush_paste()
 
             # Behavior: ENTER -> new line; SHIFT+ENTER -> SEND (reverted to original)
             if event.key == pygame.K_RETURN:
                 if mods & pygame.KMOD_SHIFT:
                     # Send (Shift+Enter)
-                    text = "\n".join(self.text_lines)
-                    self.text_lines = ['']
-                    self.cursor_line = 0
-                    self.cursor_col = 0
-                    self._sync_panel_lines()
-                    return text
+                    return self._take_text()
                 else:
                     # Insert newline at cursor
-                    current = self.text_lines[self.cursor_line]
-                    left = current[:self.cursor_col]
-                    right = current[self.cursor_col:]
-                    self.text_lines[self.cursor_line] = left
-                    self.text_lines.insert(self.cursor_line + 1, right)
-                    self.cursor_line += 1
-                    self.cursor_col = 0
-                    # reflow from previous line just in case
-                    start = max(0, self.cursor_line - 1)
-                    self._reflow_from(start)
-                    self._sync_panel_lines(keep_scroll=True)
-                    self._auto_scroll_to_cursor()
+                    self._insert_text("\n")
                     return None
 
             elif event.key == pygame.K_BACKSPACE:
-                if self.cursor_col > 0:
-                    line = self.text_lines[self.cursor_line]
-                    self.text_lines[self.cursor_line] = line[:self.cursor_col - 1] + line[self.cursor_col:]
-                    self.cursor_col -= 1
-                    self._reflow_from(self.cursor_line)
-                else:
-                    if self.cursor_line > 0:
-                        prev = self.text_lines[self.cursor_line - 1]
-                        curr = self.text_lines[self.cursor_line]
-                        new_col = len(prev)
-                        self.text_lines[self.cursor_line - 1] = prev + curr
-                        self.text_lines.pop(self.cursor_line)
-                        self.cursor_line -= 1
-                        self.cursor_col = new_col
-                        self._reflow_from(max(0, self.cursor_line - 1))
-                self._sync_panel_lines(keep_scroll=True)
-                self._auto_scroll_to_cursor()
+                offset = self._cursor_offset()
+                if offset > 0:
+                    self._delete_range(offset - 1, offset)
 
             elif event.key == pygame.K_DELETE:
-                line = self.text_lines[self.cursor_line]
-                if self.cursor_col < len(line):
-                    self.text_lines[self.cursor_line] = line[:self.cursor_col] + line[self.cursor_col + 1:]
-                    self._reflow_from(self.cursor_line)
-                else:
-                    if self.cursor_line + 1 < len(self.text_lines):
-                        self.text_lines[self.cursor_line] = line + self.text_lines[self.cursor_line + 1]
-                        self.text_lines.pop(self.cursor_line + 1)
-                        self._reflow_from(max(0, self.cursor_line - 1))
-                self._sync_panel_lines(keep_scroll=True)
-                self._auto_scroll_to_cursor()
+                offset = self._cursor_offset()
+                self._delete_range(offset, offset + 1)
 
             elif event.key == pygame.K_LEFT:
-                if self.cursor_col > 0:
-                    self.cursor_col -= 1
-                elif self.cursor_line > 0:
-                    self.cursor_line -= 1
-                    self.cursor_col = len(self.text_lines[self.cursor_line])
+                self._set_cursor_offset(self.cursor_offset - 1)
                 self._auto_scroll_to_cursor()
 
             elif event.key == pygame.K_RIGHT:
-                if self.cursor_col < len(self.text_lines[self.cursor_line]):
-                    self.cursor_col += 1
-                elif self.cursor_line + 1 < len(self.text_lines):
-                    self.cursor_line += 1
-                    self.cursor_col = 0
+                self._set_cursor_offset(self.cursor_offset + 1)
                 self._auto_scroll_to_cursor()
 
             elif event.key == pygame.K_UP:
                 if self.cursor_line > 0:
                     self.cursor_line -= 1
                     self.cursor_col = min(self.cursor_col, len(self.text_lines[self.cursor_line]))
+                    self._cursor_from_visual()
                     self._auto_scroll_to_cursor()
 
             elif event.key == pygame.K_DOWN:
                 if self.cursor_line + 1 < len(self.text_lines):
                     self.cursor_line += 1
                     self.cursor_col = min(self.cursor_col, len(self.text_lines[self.cursor_line]))
+                    self._cursor_from_visual()
                     self._auto_scroll_to_cursor()
 
             elif event.key == pygame.K_HOME:
                 self.cursor_col = 0
+                self._cursor_from_visual()
                 self._auto_scroll_to_cursor()
 
             elif event.key == pygame.K_END:
                 self.cursor_col = len(self.text_lines[self.cursor_line])
+                self._cursor_from_visual()
                 self._auto_scroll_to_cursor()
 
             # paste / copy
             elif event.key == pygame.K_v and (mods & pygame.KMOD_CTRL):
-                paste = pyperclip.paste()
-                if paste:
-                    parts = paste.split("\n")
-                    current = self.text_lines[self.cursor_line]
-                    left = current[:self.cursor_col]
-                    right = current[self.cursor_col:]
-                    left += parts[0]
-                    if len(parts) == 1:
-                        self.text_lines[self.cursor_line] = left + right
-                        self.cursor_col = len(left)
-                        self._reflow_from(self.cursor_line)
-                    else:
-                        self.text_lines[self.cursor_line] = left
-                        for i, p in enumerate(parts[1:]):
-                            self.text_lines.insert(self.cursor_line + 1 + i, p)
-                        self.text_lines[self.cursor_line + len(parts) - 1] += right
-                        self.cursor_line += len(parts) - 1
-                        self.cursor_col = len(self.text_lines[self.cursor_line]) - len(right)
-                        self._reflow_from(max(0, self.cursor_line - len(parts)))
-                    self._sync_panel_lines(keep_scroll=True)
-                    self._auto_scroll_to_cursor()
+                # o texto chega depois, em update()
+                self.clipboard.request_paste()
 
             elif event.key == pygame.K_c and (mods & pygame.KMOD_CTRL):
-                pyperclip.copy("\n".join(self.text_lines))
+                self.clipboard.copy(self.buffer.text())
 
             else:
                 # normal character insertion
                 if event.unicode:
-                    line = self.text_lines[self.cursor_line]
-                    self.text_lines[self.cursor_line] = line[:self.cursor_col] + event.unicode + line[self.cursor_col:]
-                    self.cursor_col += 1
-                    self._reflow_from(self.cursor_line)
-                    self._sync_panel_lines(keep_scroll=True)
-                    self._auto_scroll_to_cursor()
+                    self._insert_text(event.unicode)
 
         return None
 
+    def next_timer(self):
+        """Seconds until the next cursor blink, or None when nothing is pending."""
+        if self._paste_pending() or self._todo_count:
+            return 0.0
+        if not self.active:
+            return None
+        return max(0.0, self.cursor_interval - self.cursor_timer)
+
     def update(self, dt):
+        for text in self.clipboard.poll():
+            self._queue_paste(text)
+        if self._paste_pending():
+            self._paste_chunk()
+        if self._todo_count:
+            self._rewrap_slice()
         self.cursor_timer += dt
         if self.cursor_timer >= self.cursor_interval:
             self.cursor_visible = not self.cursor_visible
             self.cursor_timer = 0.0
+            if self.active:
+                cursor_rect = self._cursor_rect()
+                if cursor_rect is not None:
+                    self.mark_dirty(cursor_rect)
+
+    def close(self):
+        self.clipboard.close()
 
     def draw(self, active_area, font):
-        # draw input background / border
-        pygame.draw.rect(self.surface, BORDER_COLOR, self.rect, 2)
+        # borda, trilho da barra e botão Enviar vêm da camada estática do Renderer
         if active_area == 'input' and self.active:
-            pygame.draw.rect(self.surface, (255, 255, 0), self.rect, 3)
-
-        # ensure panel holds lines but don't destroy panel.lines permanently
-        old_lines = list(self.panel.lines)
-        panel_lines = [(ln, (255, 255, 255)) for ln in self.text_lines]
+            draw_outline(self.surface, HIGHLIGHT_COLOR, self.rect, 3)
 
-        # insert cursor visual
-        if self.cursor_visible and self.active:
-            idx = self._cursor_absolute_index()
-            if 0 <= idx < len(panel_lines):
-                text, col = panel_lines[idx]
-                cpos = max(0, min(self.cursor_col, len(text)))
-                text_with_cursor = text[:cpos] + "|" + text[cpos:]
-                panel_lines[idx] = (text_with_cursor, col)
-
-        self.panel.lines = panel_lines
         self.panel.draw(self.font, self.surface)
-        self.panel.lines = old_lines
 
-        # draw send button
-        pygame.draw.rect(self.surface, (0, 128, 0), self.send_button_rect)
-        label = self.font.render("Enviar", True, (255, 255, 255))
-        self.surface.blit(label, label.get_rect(center=self.send_button_rect.center))
\ No newline at end of file
+        # cursor as an overlay: the panel lines are not touched
+        if self.cursor_visible and self.active:
+            cursor_rect = self._cursor_rect()
+            if cursor_rect is not None:
+                self.surface.fill(WHITE, cursor_rect)
\ No newline at end of file
@@ -0,0 +1,63 @@
+# layout.py
+import pygame
+from config import (
+    PLAYER_INFO_HEIGHT_RATIO, CHATBOX_WIDTH_RATIO, MAIN_AREA_HEIGHT_RATIO, INPUT_HEIGHT_RATIO,
+    MARGIN, SCROLLBAR_WIDTH, SEND_BUTTON_WIDTH, SEND_BUTTON_HEIGHT
+)
+
+class Layout:
+    """Every region rect of the window, computed once per window size from the
+    config ratios. Widgets read the rects (and must not mutate them) and
+    subscribe() to be told when a resize changed them."""
+
+    def __init__(self, size):
+        self.size = None
+        self._listeners = []
+        self.resize(size)
+
+    def subscribe(self, callback):
+        """callback(layout) runs after every size change."""
+        self._listeners.append(callback)
+
+    def resize(self, size):
+        """Recompute for `size` (w, h). Returns False if nothing changed."""
+        size = tuple(size)
+        if size == self.size:
+            return False
+        self.size = size
+        self._compute(*size)
+        for callback in self._listeners:
+            callback(self)
+        return True
+
+    def _compute(self, w, h):
+        self.player = pygame.Rect(MARGIN, MARGIN, w - 2 * MARGIN, int(h * PLAYER_INFO_HEIGHT_RATIO) - 2 * MARGIN)
+
+        # área principal: chat (+ barra de rolagem) à esquerda, info do jogo à direita
+        top = self.player.bottom + MARGIN
+        main_h = int(h * MAIN_AREA_HEIGHT_RATIO) - 2 * MARGIN
+        self.chat = pygame.Rect(MARGIN, top, int(w * CHATBOX_WIDTH_RATIO) - MARGIN - SCROLLBAR_WIDTH, main_h)
+        self.chat_scrollbar = pygame.Rect(self.chat.right + MARGIN, top, SCROLLBAR_WIDTH, main_h)
+        self.chat_area = self.chat.union(self.chat_scrollbar)
+        game_x = self.chat.right + SCROLLBAR_WIDTH + 2 * MARGIN
+        self.game = pygame.Rect(game_x, top, w - game_x - MARGIN, main_h)
+
+        # input embaixo, na largura toda, sem passar da borda da janela
+        input_y = self.game.bottom + MARGIN
+        input_h = max(2 * MARGIN + 1, min(int(h * INPUT_HEIGHT_RATIO) - MARGIN, h - MARGIN - input_y))
+        self.input = pygame.Rect(MARGIN, input_y, w - 2 * MARGIN, input_h)
+        inner_y = self.input.y + MARGIN
+        inner_h = self.input.height - 2 * MARGIN
+        text_w = self.input.width - SEND_BUTTON_WIDTH - 4 * MARGIN - SCROLLBAR_WIDTH
+        self.input_text = pygame.Rect(self.input.x + MARGIN, inner_y, text_w, inner_h)
+        self.input_scrollbar = pygame.Rect(self.input_text.right + MARGIN, inner_y, SCROLLBAR_WIDTH, inner_h)
+        self.send_button = pygame.Rect(
+            self.input.right - SEND_BUTTON_WIDTH - MARGIN,
+            self.input.y + (self.input.height - SEND_BUTTON_HEIGHT) // 2,
+            SEND_BUTTON_WIDTH, SEND_BUTTON_HEIGHT
+        )
+        self._areas = {"chat": self.chat, "input": self.input, "player": self.player, "game": self.game}
+
+    def area_rect(self, area):
+        """Rect of a focusable area ('chat', 'input', 'player', 'game')."""
+        return self._areas.get(area)
@@ -1,49 +1,138 @@
 # main.py
+import argparse
+import os
 import pygame
-from config import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, FONT_NAME, FONT_SIZE, BLACK
-from chat_window import ChatWindow
+from config import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, FONT_SIZE, RENDER_MODE, HISTORY_DIR, SAVE_FILE, SIM_AUTOSAVE_INTERVAL
+)
+from chat_window import ChatWindow, CHAT_INGEST
+from message_store import MessageStore
 from input_box import InputBox
 from gui_regions import GUIRegions
-
-def main():
+from renderer import Renderer, RENDER_MODES
+from scheduler import FrameScheduler
+from scrollable_panel import ScrollablePanel
+from render_cache import shared_render_cache
+from profiler import Profiler, ProfilerOverlay
+from responder import ResponsePipeline, StaticResponder, FakeResponder, BOT_RESPONSE
+from clipboard import CLIPBOARD_EVENT, Clipboard
+from chat_search import SEARCH_EVENT
+from event_dispatch import EventDispatcher, MOUSE_EVENTS
+from fonts import get_font
+from resize import ResizeDebouncer
+from idle_engine import IdleEngine, format_amount, format_duration
+from info_panels import InfoPanels
+
+def create_profiler(chat_window, input_box):
+    """Profiler with the hot paths registered (wrapped only while enabled)."""
+    profiler = Profiler()
+    profiler.instrument(ChatWindow, "add_message", "add_messages", "process_event", "update", "draw",
+                        "_wrap_visible")
+    profiler.instrument(InputBox, "process_event", "update", "draw", "_reflow_all", "_rewrap_paragraphs", "_rewrap_slice")
+    profiler.instrument(ScrollablePanel, "draw", "process_event")
+    profiler.instrument(Renderer, "_draw_widgets", "_present")
+    profiler.instrument(ResponsePipeline, "poll")
+    profiler.instrument(IdleEngine, "update")
+    profiler.instrument(InfoPanels, "refresh", "draw")
+    profiler.add_counter("cache_hits", lambda: shared_render_cache.hits)
+    profiler.add_counter("cache_misses", lambda: shared_render_cache.misses)
+    profiler.add_counter("rows_rendered",
+                         lambda: chat_window.panel.rows_rendered + input_box.panel.rows_rendered)
+    # fila de mensagens ainda não aplicadas: nível, não variação
+    profiler.add_gauge("chat_backlog", chat_window.backlog)
+    return profiler
+
+def offline_summary(seconds, gains, names):
+    """Chat line telling what was produced while the game was closed."""
+    parts = [f"+{format_amount(g)} {name}" for g, name in zip(gains, names) if g >= 1]
+    if not parts:
+        return None
+    return f"Enquanto você esteve fora ({format_duration(seconds)}): {', '.join(parts)}"
+
+def main(render_mode=RENDER_MODE, profile=False, bot_latency=None, history_dir=HISTORY_DIR):
     pygame.init()
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.RESIZABLE)
     pygame.display.set_caption("Fox-idle Chat Game")
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+    font = get_font(FONT_SIZE)  # mesma fonte (carregada uma vez) que a InputBox usa
 
     # habilita key repeat (mantém comportamento de repetir teclas)
     pygame.key.set_repeat(400, 40)
 
-    chat_window = ChatWindow(screen)
-    input_box = InputBox(screen, chat_window)  # Passa chat_window como argumento
+    # histórico persistente: abrir só mapeia o índice; None = só nesta sessão
+    store = MessageStore(os.path.join(history_dir, "chat") if history_dir else None)
+    clipboard = Clipboard()  # um só worker para copiar do chat e colar na input
+    chat_window = ChatWindow(screen, store, clipboard=clipboard)
+    input_box = InputBox(screen, chat_window, clipboard)  # Passa chat_window como argumento
     gui_regions = GUIRegions(screen, chat_window, input_box)
+    renderer = Renderer(screen, font, chat_window, input_box, gui_regions, render_mode)
+
+    # jogo idle: progresso offline calculado de uma vez ao carregar o save
+    engine = IdleEngine()
+    save_path = os.path.join(history_dir, SAVE_FILE) if history_dir else None
+    if save_path is not None:
+        away = engine.load(save_path)
+        if away:
+            summary = offline_summary(*engine.catch_up(away), engine.resource_names)
+            if summary:
+                chat_window.add_message("bot", summary)
+    autosave = SIM_AUTOSAVE_INTERVAL
+    info = InfoPanels(screen, chat_window.layout, engine, font)
+    renderer.panels.append(info)
+    dispatcher = EventDispatcher(gui_regions)
+    dispatcher.install(extra=(BOT_RESPONSE, CLIPBOARD_EVENT, SEARCH_EVENT, CHAT_INGEST))
+    scheduler = FrameScheduler(FPS)
+    resizer = ResizeDebouncer()
+    # respostas do bot em threads; --bot-latency simula um backend lento
+    responder = StaticResponder() if bot_latency is None else FakeResponder(bot_latency)
+    bot = ResponsePipeline(chat_window, responder)
+    profiler = create_profiler(chat_window, input_box)
+    overlay = ProfilerOverlay(profiler)
+    if profile:
+        profiler.enable()
+        renderer.overlays.append(overlay)
 
     active_area = 'input'
     area_order = ['chat', 'input', 'player', 'game']
 
     running = True
     while running:
-        dt = clock.tick(FPS) / 1000.0
-
-        for event in pygame.event.get():
+        timers = [t for t in (input_box.next_timer(), chat_window.next_timer(), bot.next_timer(),
+                              info.next_timer(), resizer.next_timer())
+                  if t is not None]
+        events, dt = scheduler.wait_frame(
+            min(timers) if timers else None,
+            animating=chat_window.is_animating() or input_box.panel.dragging,
+        )
+        profiler.begin_frame()
+
+        for event in dispatcher.coalesce(events):
             if event.type == pygame.QUIT:
                 running = False
 
             elif event.type == pygame.VIDEORESIZE:
-                screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
-                chat_window.surface = screen
-                chat_window.rebuild_cache()
-                input_box.surface = screen
-                input_box.update_rects()
-                gui_regions.surface = screen
-                gui_regions.update_rects()
+                # arrastar a borda gera uma rajada: só o tamanho final é aplicado
+                resizer.request((event.w, event.h), screen)
+
+            elif event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+
+            # área sob o mouse (tabela de hit-test) ou a que segura o arrasto
+            area = dispatcher.route(event)
 
             # clique ativa a area (apenas click)
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                clicked = gui_regions.get_area_at_pos(event.pos)
-                if clicked:
-                    active_area = clicked
+                if area:
+                    active_area = area
+
+            # F3 liga/desliga o profiler e o overlay, F4 salva o trace
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                if profiler.toggle():
+                    renderer.overlays.append(overlay)
+                else:
+                    renderer.overlays.remove(overlay)
+                    renderer.invalidate()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and profiler.enabled:
+                profiler.dump_trace()  # o caminho aparece no overlay
 
             # Tab alterna areas
             if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
@@ -51,30 +140,82 @@ def main():
                 active_area = area_order[idx]
 
             # encaminhar eventos
-            # chat recebe scroll/drag se mouse estiver sobre ela ou se handle está sendo arrastado
-            chat_window.process_event(event)
+            # chat recebe só o mouse que cai nela (ou o arrasto da sua barra /
+            # da seleção) e o teclado quando está ativa (Ctrl+F: busca, Ctrl+C: copia)
+            if area == 'chat' or (active_area == 'chat' and event.type == pygame.KEYDOWN):
+                chat_window.process_event(event)
 
-            # input recebe eventos somente quando está ativa (controla digitação e scroll)
-            if active_area == 'input':
+            # input recebe o teclado quando está ativa e o mouse que cai nela
+            if active_area == 'input' and (area == 'input' or event.type not in MOUSE_EVENTS):
                 sent = input_box.process_event(event)
                 if sent is not None and sent != "":
                     chat_window.add_message("user", sent)
-                    # bot responde "N/D"
-                    chat_window.add_message("bot", "N/D")
+                    bot.submit(sent)  # resposta chega aos poucos via bot.poll()
+
+            # área do jogo: teclas de compra
+            if active_area == 'game':
+                info.process_event(event)
+
+            if chat_window.panel.dragging or chat_window.selecting:
+                dispatcher.set_capture('chat')
+            elif input_box.panel.dragging:
+                dispatcher.set_capture('input')
+            else:
+                dispatcher.set_capture(None)
+
+        profiler.lap("events")
+
+        size = resizer.poll()
+        if size is not None:
+            screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+            chat_window.surface = screen
+            input_box.surface = screen
+            gui_regions.surface = screen
+            info.surface = screen
+            renderer.surface = screen
+            # um só cálculo de layout; chat, input e regiões são avisados
+            chat_window.layout.resize(screen.get_size())
+            renderer.invalidate()
 
         # updates
+        bot.poll()
+        engine.update(dt)
+        info.update(dt)
+        autosave -= dt
+        if autosave <= 0 and save_path is not None:
+            autosave = SIM_AUTOSAVE_INTERVAL
+            engine.save(save_path)
         input_box.update(dt)
         chat_window.update(dt)
-
-        # draw
-        screen.fill(BLACK)
-        chat_window.draw(font, active_area)
-        input_box.draw(active_area, font)
-        gui_regions.draw_active_highlight(active_area)
-
-        pygame.display.update()
-
+        profiler.lap("update")
+
+        # draw (enquanto o tamanho não assenta, o último quadro esticado)
+        if resizer.pending is not None:
+            resizer.draw_preview()
+        else:
+            renderer.render(active_area)
+        profiler.lap("render")
+        profiler.end_frame()
+
+    if save_path is not None:
+        engine.save(save_path)
+    bot.close()
+    input_box.close()
+    chat_window.close()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fox-idle Chat Game")
+    parser.add_argument("--render-mode", choices=RENDER_MODES, default=RENDER_MODE,
+                        help="full: redraw everything every frame; dirty: redraw only changed rects")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the profiler overlay on (F3 toggles, F4 dumps a trace)")
+    parser.add_argument("--bot-latency", type=float, metavar="SECONDS",
+                        help="use a fake streaming bot that answers after SECONDS")
+    parser.add_argument("--history-dir", default=HISTORY_DIR,
+                        help="where the chat history log is kept between sessions")
+    parser.add_argument("--no-history", action="store_true",
+                        help="keep the chat history only for this session")
+    args = parser.parse_args()
+    main(render_mode=args.render_mode, profile=args.profile, bot_latency=args.bot_latency,
+         history_dir=None if args.no_history else args.history_dir)
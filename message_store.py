@@ -0,0 +1,398 @@
+# message_store.py
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from config import HISTORY_MEMORY_WINDOW, HISTORY_PAGE_SIZE, HISTORY_PAGE_CACHE, HISTORY_FSYNC_INTERVAL
+
+_ENTRY_SIZE = 16  # offset (q) + tamanho/sender/cor (q)
+_LENGTH_MASK = 0xFFFFFFFF
+# sender id de 24 bits: os 8 de baixo nos bits 32-39 (formato original) e o
+# resto nos bits 48-63, assim índices antigos continuam válidos
+_MAX_SENDERS = 1 << 24
+_MAX_COLORS = 1 << 8
+
+def _pack_meta(sid, color_index):
+    meta = (sid & 0xFF) << 32 | color_index << 40 | (sid >> 8) << 48
+    return meta - (1 << 64) if meta >= 1 << 63 else meta  # int64 com sinal
+
+def _meta_sender(meta):
+    return (meta >> 32) & 0xFF | ((meta >> 48) & 0xFFFF) << 8
+
+class MessageStore:
+    """Compact chat history: an append-only log of UTF-8 texts plus a
+    fixed-width index (two int64 per message: log offset, and text length in
+    bits 0-31, color index in bits 40-47 and a 24-bit sender id split over
+    bits 32-39 and 48-63).
+
+    With `path` the log (path + ".log"), index (".idx") and sender names
+    (".senders") persist between sessions. Opening only memory-maps the index,
+    so a long history costs nothing until its texts are read, and only the
+    messages scrolled to are decoded. Without `path` the log is a temporary
+    file. The most recent `window` texts stay in memory; older ones are read
+    back from the log in pages (LRU of pages). A background thread flushes and
+    fsyncs pending writes every `fsync_interval` seconds."""
+
+    def __init__(self, path=None, window=HISTORY_MEMORY_WINDOW, page_size=HISTORY_PAGE_SIZE,
+                 page_cache=HISTORY_PAGE_CACHE, fsync_interval=HISTORY_FSYNC_INTERVAL):
+        self.path = path
+        self.window = max(1, window)
+        self.page_size = max(1, page_size)
+        self.page_cache = max(1, page_cache)
+        self.senders = []  # sender id -> nome
+        self._sender_ids = {}
+        self._offsets = array('q')  # entradas do índice das mensagens desta sessão
+        self._meta = array('q')
+        self._recent = []  # textos residentes: índices >= self.spilled
+        self._pinned = set()  # mensagens que ainda podem mudar (não são gravadas nem descartadas)
+        self._pages = OrderedDict()  # page -> list[str]
+        self.page_loads = 0
+        self._lock = threading.Lock()  # escrita (loop principal) x flush (thread de fsync)
+        self._dirty = False
+        self._log_map = None
+        self._index_map = None
+        self._base_view = None  # índice das sessões anteriores, mapeado em memória
+        self.base = 0  # mensagens vindas de sessões anteriores
+        if path is None:
+            self._log = tempfile.TemporaryFile(prefix="foxidle-history-")
+            self._index = None
+            self._senders_file = None
+            self._log_size = 0
+        else:
+            self._open(path)
+        self._index_pos = self.base * _ENTRY_SIZE
+        self.spilled = self.base  # nada das sessões anteriores fica em memória
+        self._stop = threading.Event()
+        self._syncer = None
+        if path is not None and fsync_interval:
+            self._syncer = threading.Thread(target=self._sync_loop, args=(fsync_interval,),
+                                            name="history-fsync", daemon=True)
+            self._syncer.start()
+
+    def _open(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._log = open(path + ".log", "a+b")
+        self._log_size = self._log.seek(0, 2)
+        self._senders_file = open(path + ".senders", "a+", encoding="utf-8")
+        self._senders_file.seek(0)
+        for name in self._senders_file.read().splitlines():
+            self._sender_ids[name] = len(self.senders)
+            self.senders.append(name)
+        index_path = path + ".idx"
+        self._index = open(index_path, "r+b" if os.path.exists(index_path) else "w+b")
+        count = os.path.getsize(index_path) // _ENTRY_SIZE
+        # descarta o fim do índice que aponta além do log (queda antes do fsync)
+        fd = self._index.fileno()
+        while count:
+            offset, meta = struct.unpack("=qq", os.pread(fd, _ENTRY_SIZE, (count - 1) * _ENTRY_SIZE))
+            if offset + (meta & _LENGTH_MASK) <= self._log_size:
+                break
+            count -= 1
+        self._index.truncate(count * _ENTRY_SIZE)
+        self._index.seek(count * _ENTRY_SIZE)
+        if count:
+            self._index_map = mmap.mmap(fd, count * _ENTRY_SIZE, access=mmap.ACCESS_READ)
+            self._base_view = memoryview(self._index_map).cast('q')
+        self.base = count
+
+    def __len__(self):
+        return self.base + len(self._offsets)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return {"sender": self.sender(index), "text": self.text(index)}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _sender_id(self, sender):
+        sid = self._sender_ids.get(sender)
+        if sid is None:
+            if len(self.senders) >= _MAX_SENDERS:
+                raise ValueError(f"too many distinct senders (max {_MAX_SENDERS})")
+            sid = self._sender_ids[sender] = len(self.senders)
+            self.senders.append(sender)
+            if self._senders_file is not None:
+                with self._lock:
+                    self._senders_file.write(sender.replace("\n", " ") + "\n")
+                    self._dirty = True
+        return sid
+
+    def _entry(self, index):
+        if index < self.base:
+            view = self._base_view
+            return view[2 * index], view[2 * index + 1]
+        j = index - self.base
+        return self._offsets[j], self._meta[j]
+
+    def _write(self, index, text):
+        """Append `text` to the log and point the index entry of `index` at it."""
+        data = text.encode("utf-8", errors="replace")
+        j = index - self.base
+        meta = len(data) | (self._meta[j] & ~_LENGTH_MASK)
+        with self._lock:
+            offset = self._log_size
+            self._log.write(data)
+            self._log_size += len(data)
+            self._offsets[j] = offset
+            self._meta[j] = meta
+            if self._index is not None:
+                pos = index * _ENTRY_SIZE
+                if pos != self._index_pos:
+                    self._index.seek(pos)
+                self._index.write(struct.pack("=qq", offset, meta))
+                self._index_pos = pos + _ENTRY_SIZE
+            self._dirty = True
+
+    def append(self, sender, text, color_index=0):
+        """Store a message and return its index."""
+        if not 0 <= color_index < _MAX_COLORS:
+            raise ValueError(f"color index out of range: {color_index}")
+        meta = _pack_meta(self._sender_id(sender), color_index)
+        self._offsets.append(0)
+        self._meta.append(meta)
+        self._recent.append(text)
+        index = len(self) - 1
+        self._write(index, text)
+        if len(self._recent) >= self.window + self.page_size:
+            self._trim_page()
+        return index
+
+    def pin(self, index):
+        """Keep message `index` resident (editable) until unpin(), e.g. while
+        streaming; its edits are written to the log only at unpin()."""
+        self._pinned.add(index)
+
+    def unpin(self, index):
+        if index not in self._pinned:
+            return
+        self._pinned.discard(index)
+        self._write(index, self.text(index))
+        if len(self._recent) >= self.window + self.page_size:
+            self._trim_page()
+
+    def set_text(self, index, text):
+        """Replace the text of a resident message."""
+        if index < self.spilled:
+            raise IndexError(f"message {index} is no longer resident")
+        self._recent[index - self.spilled] = text
+        if index not in self._pinned:
+            self._write(index, text)
+
+    def _trim_page(self):
+        """Drop the oldest resident texts (up to a page boundary) from memory;
+        they are already in the log."""
+        n = self.page_size - self.spilled % self.page_size
+        if self._pinned and min(self._pinned) < self.spilled + n:
+            return  # a página ainda tem mensagem em edição
+        self._pages.pop(self.spilled // self.page_size, None)  # página parcial em cache
+        del self._recent[:n]
+        self.spilled += n
+
+    def sender(self, index):
+        sid = _meta_sender(self._entry(index)[1])
+        return self.senders[sid] if sid < len(self.senders) else "?"
+
+    def color_index(self, index):
+        return (self._entry(index)[1] >> 40) & 0xFF
+
+    def text(self, index):
+        if index >= self.spilled:
+            return self._recent[index - self.spilled]
+        page = index // self.page_size
+        texts = self._pages.get(page)
+        if texts is None:
+            texts = self._load_page(page)
+        else:
+            self._pages.move_to_end(page)
+        return texts[index - page * self.page_size]
+
+    def _log_bytes(self, end):
+        """Memory map of the log covering at least `end` bytes."""
+        if self._log_map is None or len(self._log_map) < end:
+            with self._lock:
+                self._log.flush()
+            if self._log_map is not None:
+                self._log_map.close()
+            self._log_map = mmap.mmap(self._log.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._log_map
+
+    def _load_page(self, page):
+        first = page * self.page_size
+        last = min(first + self.page_size, self.spilled)
+        entries = [self._entry(i) for i in range(first, last)]
+        end = max((offset + (meta & _LENGTH_MASK) for offset, meta in entries), default=0)
+        data = self._log_bytes(end) if end else b""
+        texts = []
+        for offset, meta in entries:
+            texts.append(data[offset:offset + (meta & _LENGTH_MASK)].decode("utf-8", errors="replace"))
+        self._pages[page] = texts
+        self.page_loads += 1
+        if len(self._pages) > self.page_cache:
+            self._pages.popitem(last=False)
+        return texts
+
+    def reader(self):
+        """Read-only access to the stored texts for another thread (search)."""
+        return _LogReader(self)
+
+    def _sync_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.sync()
+
+    def sync(self):
+        """Flush pending writes and fsync them: log, then sender names, then
+        index, so a stored index entry never points at unwritten text."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            files = [f for f in (self._log, self._senders_file, self._index) if f is not None]
+            for f in files:
+                f.flush()
+        # fsync fora do lock: o loop principal nunca espera pelo disco
+        for f in files:
+            os.fsync(f.fileno())
+
+    def close(self):
+        if self._syncer is not None:
+            self._stop.set()
+            self._syncer.join()
+        if self.path is not None:
+            self.sync()
+        if self._base_view is not None:
+            self._base_view.release()
+            self._index_map.close()
+        if self._log_map is not None:
+            self._log_map.close()
+        for f in (self._log, self._senders_file, self._index):
+            if f is not None:
+                f.close()
+
+class _LogReader:
+    """Reads message texts straight from the log through its own memory map,
+    so a worker thread never touches the store's page cache. Edits still in
+    progress (pinned messages) are seen as last written."""
+
+    def __init__(self, store):
+        self._store = store
+        self._map = None
+
+    def text(self, index):
+        store = self._store
+        if index < store.base:
+            offset, meta = store._entry(index)  # parte mapeada: nunca muda
+        else:
+            with store._lock:
+                offset, meta = store._entry(index)
+        end = offset + (meta & _LENGTH_MASK)
+        if end == offset:
+            return ""
+        if self._map is None or len(self._map) < end:
+            with store._lock:
+                store._log.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(store._log.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset:end].decode("utf-8", errors="replace")
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+class LineIndex:
+    """Line count per message with prefix sums in a Fenwick tree: start line of
+    a message, message at a line and count updates are all O(log n)."""
+
+    def __init__(self):
+        self.counts = array('I')
+        self._tree = array('q', [0])  # 1-based
+        self.total = 0
+
+    @classmethod
+    def ones(cls, n):
+        """Index of n messages with one line each, built without a Python loop
+        per message: tree[i] is then lowbit(i), built by doubling."""
+        index = cls()
+        index.counts = array('I', [1]) * n
+        tree = array('q', [0, 1])
+        k = 1
+        while k < n:
+            # lowbit(k + j) == lowbit(j) para 0 < j < k; lowbit(2k) == 2k
+            tail = tree[1:k + 1]
+            tail[-1] = 2 * k
+            tree.extend(tail)
+            k *= 2
+        del tree[n + 1:]
+        index._tree = tree
+        index.total = n
+        return index
+
+    def __len__(self):
+        return len(self.counts)
+
+    def append(self, count):
+        self.counts.append(count)
+        n = len(self.counts)
+        # nó n cobre (n - lowbit(n), n]
+        self._tree.append(count + self.start(n - 1) - self.start(n - (n & -n)))
+        self.total += count
+
+    def splice(self, index, old_count, counts):
+        """Replace the counts of messages index..index+old_count-1 by `counts`.
+        Only the tree nodes from `index` on are rebuilt, from prefix sums."""
+        self.counts[index:index + old_count] = array('I', counts)
+        prefix = list(accumulate(self.counts, initial=0))
+        tree = self._tree
+        del tree[index + 1:]
+        # nó k cobre (k - lowbit(k), k]; k & (k - 1) == k - lowbit(k)
+        tree.extend(prefix[k] - prefix[k & (k - 1)] for k in range(index + 1, len(prefix)))
+        self.total = prefix[-1]
+
+    def set(self, index, count):
+        delta = count - self.counts[index]
+        if not delta:
+            return
+        self.counts[index] = count
+        self.total += delta
+        i = index + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def start(self, index):
+        """First line of message `index` (= total lines of the messages before it)."""
+        total = 0
+        tree = self._tree
+        i = index
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, line):
+        """Index of the message that holds line `line`."""
+        if not self.counts:
+            return 0
+        pos = 0
+        step = 1 << (len(self.counts).bit_length())
+        tree = self._tree
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= line:
+                pos = nxt
+                line -= tree[nxt]
+            step >>= 1
+        return min(pos, len(self.counts) - 1)
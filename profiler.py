@@ -0,0 +1,212 @@
+# profiler.py
+import functools
+import json
+import os
+import time
+from collections import deque
+import pygame
+from fonts import get_font
+from config import (
+    FPS, MARGIN, BORDER_COLOR, WHITE,
+    PROFILER_FRAMES, PROFILER_EVENTS, PROFILER_GRAPH_FRAMES
+)
+
+class Profiler:
+    """Opt-in frame profiler. Loop phases are timed with lap(); methods
+    registered with instrument() are wrapped only while the profiler is
+    enabled, so when it is off the hot paths run the original functions.
+
+    Per-frame timings go to a ring buffer (frames) for the overlay and every
+    timed call to another one (events) for dump_trace. Each frame also keeps
+    counters (the change of a running total, e.g. cache hits) and gauges
+    (a level read at the end of the frame, e.g. a queue length)."""
+
+    def __init__(self, max_frames=PROFILER_FRAMES, max_events=PROFILER_EVENTS):
+        self.enabled = False
+        self.frames = deque(maxlen=max_frames)
+        self.events = deque(maxlen=max_events)  # (name, start, duration) em segundos
+        self.frame_no = 0
+        self._targets = []  # (cls, method names)
+        self._originals = []  # (cls, name, function) while enabled
+        self._counters = {}  # name -> callable returning a cumulative value
+        self._counter_last = {}
+        self._gauges = {}  # name -> callable returning the current level
+        self._frame = None
+        self.last_trace = None  # caminho do último dump_trace (mostrado no overlay)
+        self._frame_start = 0.0
+        self._lap_start = 0.0
+
+    def instrument(self, cls, *names):
+        self._targets.append((cls, names))
+        if self.enabled:
+            for name in names:
+                self._wrap(cls, name)
+
+    def add_counter(self, name, read):
+        """Per-frame delta of read() is stored with each frame (e.g. cache hits)."""
+        self._counters[name] = read
+
+    def add_gauge(self, name, read):
+        """Absolute value of read() is stored with each frame (e.g. queue length)."""
+        self._gauges[name] = read
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for cls, names in self._targets:
+            for name in names:
+                self._wrap(cls, name)
+        self._counter_last = {name: read() for name, read in self._counters.items()}
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for cls, name, fn in reversed(self._originals):
+            setattr(cls, name, fn)
+        self._originals = []
+        self._frame = None
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    def _wrap(self, cls, name):
+        fn = cls.__dict__[name]
+        label = f"{cls.__name__}.{name}"
+        record = self.record
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, t0, time.perf_counter())
+
+        setattr(cls, name, timed)
+        self._originals.append((cls, name, fn))
+
+    def record(self, name, t0, t1):
+        frame = self._frame
+        if frame is not None:
+            ms = (t1 - t0) * 1000.0
+            frame["phases"][name] = frame["phases"].get(name, 0.0) + ms
+            frame["calls"][name] = frame["calls"].get(name, 0) + 1
+        self.events.append((name, t0, t1 - t0))
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = self._lap_start = time.perf_counter()
+        self._frame = {"frame": self.frame_no, "phases": {}, "calls": {}}
+
+    def lap(self, name):
+        """Time since the previous lap (or begin_frame) is recorded as phase `name`."""
+        if self._frame is None:
+            return
+        now = time.perf_counter()
+        self.record(name, self._lap_start, now)
+        self._lap_start = now
+
+    def end_frame(self):
+        frame = self._frame
+        if frame is None:
+            return
+        now = time.perf_counter()
+        frame["ms"] = (now - self._frame_start) * 1000.0
+        counters = {}
+        for name, read in self._counters.items():
+            value = read()
+            counters[name] = value - self._counter_last.get(name, value)
+            self._counter_last[name] = value
+        frame["counters"] = counters
+        frame["gauges"] = {name: read() for name, read in self._gauges.items()}
+        self.frames.append(frame)
+        self.events.append(("frame", self._frame_start, now - self._frame_start))
+        self.frame_no += 1
+        self._frame = None
+
+    def dump_trace(self, path=None):
+        """Write the event ring buffer as a Chrome trace (chrome://tracing, Perfetto)
+        plus the per-frame summaries. Returns the file path."""
+        if path is None:
+            path = time.strftime("foxidle-trace-%Y%m%d-%H%M%S.json")
+        events = [
+            {"name": name, "ph": "X", "ts": start * 1e6, "dur": dur * 1e6, "pid": 0, "tid": 0}
+            for name, start, dur in self.events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "frames": list(self.frames)}, f)
+        self.last_trace = path
+        return path
+
+class ProfilerOverlay:
+    """On-screen frame time graph and counters for a Profiler (Renderer overlay)."""
+
+    WIDTH = 260
+    GRAPH_HEIGHT = 60
+    LINES = 8
+
+    def __init__(self, profiler, font_size=14):
+        self.profiler = profiler
+        self.font = get_font(font_size)
+        self.line_height = self.font.get_linesize()
+
+    def draw(self, surface):
+        height = self.GRAPH_HEIGHT + self.LINES * self.line_height + 3 * MARGIN
+        rect = pygame.Rect(surface.get_width() - self.WIDTH - 2 * MARGIN, 2 * MARGIN, self.WIDTH, height)
+        surface.fill((20, 20, 20), rect)
+        pygame.draw.rect(surface, BORDER_COLOR, rect, 1)
+
+        frames = list(self.profiler.frames)[-PROFILER_GRAPH_FRAMES:]
+        budget = 1000.0 / FPS
+        scale = self.GRAPH_HEIGHT / (2 * budget)  # topo do gráfico = 2 quadros
+        graph = pygame.Rect(rect.x + MARGIN, rect.y + MARGIN, rect.width - 2 * MARGIN, self.GRAPH_HEIGHT)
+        bar_w = max(1, graph.width // PROFILER_GRAPH_FRAMES)
+        for i, frame in enumerate(frames):
+            h = min(graph.height, int(frame["ms"] * scale))
+            color = (0, 200, 0) if frame["ms"] <= budget else (220, 60, 60)
+            surface.fill(color, (graph.x + i * bar_w, graph.bottom - h, bar_w, h))
+        budget_y = graph.bottom - int(budget * scale)
+        pygame.draw.line(surface, (200, 200, 0), (graph.x, budget_y), (graph.right, budget_y))
+
+        lines = self._summary(frames)
+        y = graph.bottom + MARGIN
+        for text in lines[:self.LINES]:
+            surface.blit(self.font.render(text, True, WHITE), (rect.x + MARGIN, y))
+            y += self.line_height
+        return rect
+
+    def _summary(self, frames):
+        if not frames:
+            return ["sem quadros"]
+        times = [f["ms"] for f in frames]
+        last = frames[-1]
+        counters = {}
+        for f in frames:
+            for name, value in f["counters"].items():
+                counters[name] = counters.get(name, 0) + value
+        hits, misses = counters.get("cache_hits", 0), counters.get("cache_misses", 0)
+        lookups = hits + misses
+        phases = {}
+        for f in frames:
+            for name, ms in f["phases"].items():
+                phases[name] = phases.get(name, 0.0) + ms
+        top = sorted(phases.items(), key=lambda kv: -kv[1])[:3]
+        lines = [
+            f"frame {last['ms']:.2f} ms  avg {sum(times) / len(times):.2f}  max {max(times):.2f}",
+            f"cache hits {hits}/{lookups} ({100.0 * hits / lookups if lookups else 100.0:.0f}%)",
+            f"rows drawn {counters.get('rows_rendered', 0)} in {len(frames)} frames",
+        ]
+        for name in last["gauges"]:
+            peak = max(f["gauges"].get(name, 0) for f in frames)
+            lines.append(f"{name} {last['gauges'][name]} (max {peak})")
+        if self.profiler.last_trace is not None:
+            lines.append(f"trace: {os.path.basename(self.profiler.last_trace)}")
+        lines += [f"{name} {ms / len(frames):.3f} ms/frame" for name, ms in top]
+        return lines
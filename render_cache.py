@@ -0,0 +1,60 @@
+# render_cache.py
+from collections import OrderedDict
+import pygame
+from config import RENDER_CACHE_SIZE
+
+class RenderCache:
+    """LRU cache of rendered text surfaces keyed by (text, color, font).
+    Keeps hit/miss counters so the draw path can be measured."""
+
+    def __init__(self, max_entries=RENDER_CACHE_SIZE):
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # (text, color, font) -> Surface
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self, font: pygame.font.Font, text: str, color) -> pygame.Surface:
+        key = (text, tuple(color), font)
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = self._rasterize(font, text, color)
+        self._entries[key] = surf
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    @staticmethod
+    def _rasterize(font, text, color):
+        # fonts come from fonts.get_font: FallbackFont already drops the chars
+        # SDL_ttf rejects, so there is nothing to catch here
+        return font.render(text or " ", True, color)
+
+    def clear(self):
+        self._entries.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+# cache compartilhado entre o painel do chat e o da input
+shared_render_cache = RenderCache()
@@ -0,0 +1,112 @@
+# renderer.py
+import pygame
+from config import RENDER_MODE
+from static_layer import StaticLayer
+
+RENDER_MODES = ("full", "dirty")
+
+class Renderer:
+    """Draws a frame either fully ("full") or only the rects the widgets
+    reported as changed ("dirty"), and passes those to display.update.
+    In dirty mode the widgets are redrawn under the clip of each rect, which
+    may be as small as the cursor: whatever they draw must come out the same
+    for any clip (focus outlines go through gui_regions.draw_outline)."""
+
+    def __init__(self, surface, font, chat_window, input_box, gui_regions, mode=RENDER_MODE):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"unknown render mode: {mode!r}")
+        self.surface = surface
+        self.font = font
+        self.chat_window = chat_window
+        self.input_box = input_box
+        self.gui_regions = gui_regions
+        self.mode = mode
+        # fundo, bordas, títulos, trilhos e botão: composto uma vez por tamanho
+        self.static_layer = StaticLayer(chat_window.layout, font)
+        self._full_redraw = True
+        self.overlays = []  # objects with draw(surface) -> Rect, drawn on top every frame
+        self.panels = []  # extra widgets with draw(font) and pop_dirty_rects()
+        # contadores para comparar os modos
+        self.frames = 0
+        self.frames_drawn = 0
+        self.pixels_updated = 0
+
+    def invalidate(self):
+        """Force a full redraw on the next frame (resize, mode switch)."""
+        self._full_redraw = True
+
+    def _collect_dirty_rects(self, active_area):
+        rects = (
+            self.chat_window.pop_dirty_rects()
+            + self.input_box.pop_dirty_rects()
+            + self.gui_regions.pop_dirty_rects(active_area)
+        )
+        for panel in self.panels:
+            rects += panel.pop_dirty_rects()
+        screen_rect = self.surface.get_rect()
+        merged = []
+        for r in rects:
+            r = r.clip(screen_rect)
+            if r.width <= 0 or r.height <= 0:
+                continue
+            # junta retângulos sobrepostos para não redesenhar a mesma área duas vezes
+            i = r.collidelist(merged)
+            while i != -1:
+                r = r.union(merged.pop(i))
+                i = r.collidelist(merged)
+            merged.append(r)
+        return merged
+
+    def _draw_widgets(self, active_area):
+        self.chat_window.draw(self.font, active_area)
+        self.input_box.draw(active_area, self.font)
+        for panel in self.panels:
+            panel.draw(self.font)
+        self.gui_regions.draw_active_highlight(active_area)
+
+    def _draw_overlays(self):
+        return [overlay.draw(self.surface) for overlay in self.overlays]
+
+    def _present(self, rects):
+        """Push the frame to the window (None = whole window)."""
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+
+    def render(self, active_area):
+        """Draw the frame and update the display. Returns the updated rects
+        (an empty list means nothing changed, a full-window rect for full redraws)."""
+        self.frames += 1
+        dirty = self._collect_dirty_rects(active_area)
+
+        if self.mode == "full" or self._full_redraw:
+            self._full_redraw = False
+            self.static_layer.draw(self.surface)
+            self._draw_widgets(active_area)
+            self._draw_overlays()
+            self._present(None)
+            rects = [self.surface.get_rect()]
+        else:
+            for rect in dirty:
+                self.surface.set_clip(rect)
+                self.static_layer.draw(self.surface, rect)
+                self._draw_widgets(active_area)
+            self.surface.set_clip(None)
+            dirty.extend(self._draw_overlays())
+            if dirty:
+                self._present(dirty)
+            rects = dirty
+
+        if rects:
+            self.frames_drawn += 1
+            self.pixels_updated += sum(r.width * r.height for r in rects)
+        return rects
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "frames": self.frames,
+            "frames_drawn": self.frames_drawn,
+            "pixels_updated": self.pixels_updated,
+        }
@@ -0,0 +1,56 @@
+# resize.py
+import time
+import pygame
+from config import RESIZE_DEBOUNCE
+
+class ResizeDebouncer:
+    """Waits for the window size to settle before relaying out.
+
+    Dragging a window edge sends a burst of VIDEORESIZE events; request()
+    only records the latest size, and poll() hands it over once no new one
+    arrived for `delay` seconds. Until then draw_preview() shows the last
+    full frame scaled to the current window instead of re-rendering."""
+
+    def __init__(self, delay=RESIZE_DEBOUNCE):
+        self.delay = delay
+        self.pending = None  # tamanho pedido e ainda não aplicado
+        self._deadline = 0.0
+        self._snapshot = None  # último quadro antes do redimensionamento
+        self._preview_size = None
+        self.requests = 0  # estatística: eventos recebidos / aplicados
+        self.applied = 0
+
+    def request(self, size, screen):
+        if self.pending is None:
+            self._snapshot = screen.copy()
+            self._preview_size = None
+        self.pending = tuple(size)
+        self._deadline = time.perf_counter() + self.delay
+        self.requests += 1
+
+    def next_timer(self):
+        """Seconds until the pending size is due, or None."""
+        if self.pending is None:
+            return None
+        return max(0.0, self._deadline - time.perf_counter())
+
+    def poll(self):
+        """The settled size to apply now, or None."""
+        if self.pending is None or time.perf_counter() < self._deadline:
+            return None
+        size, self.pending = self.pending, None
+        self._snapshot = None
+        self.applied += 1
+        return size
+
+    def draw_preview(self):
+        """Show the snapshot scaled to the window (only when its size changed)."""
+        surface = pygame.display.get_surface()
+        if surface is None or self._snapshot is None:
+            return
+        size = surface.get_size()
+        if size == self._preview_size:
+            return
+        self._preview_size = size
+        pygame.transform.scale(self._snapshot, size, surface)
+        pygame.display.flip()
@@ -0,0 +1,152 @@
+# responder.py
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from config import BOT_REPLY, BOT_MAX_CONCURRENT, BOT_TIMEOUT
+
+# acorda o loop principal quando chega um pedaço de resposta (os dados vão pela fila)
+BOT_RESPONSE = pygame.event.custom_type()
+
+class Responder:
+    """Produces bot replies. respond() runs on a worker thread and yields the
+    reply in chunks (a single chunk for non-streaming backends). `cancelled`
+    is a threading.Event set on timeout or shutdown; slow backends should
+    check it (or wait on it) instead of sleeping."""
+
+    def respond(self, prompt, cancelled):
+        raise NotImplementedError
+
+class StaticResponder(Responder):
+    """Always answers the same text (the game's default "N/D")."""
+
+    def __init__(self, reply=BOT_REPLY):
+        self.reply = reply
+
+    def respond(self, prompt, cancelled):
+        yield self.reply
+
+class FakeResponder(Responder):
+    """Simulated slow backend: waits `latency` seconds, then streams the reply
+    word by word, one every `token_delay` seconds."""
+
+    def __init__(self, latency=1.0, token_delay=0.05, reply=None):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.reply = reply
+
+    def respond(self, prompt, cancelled):
+        if cancelled.wait(self.latency):
+            return
+        text = self.reply if self.reply is not None else f"Você disse: {prompt}"
+        for token in re.findall(r"\s*\S+\s*", text) or [text]:
+            yield token
+            if cancelled.wait(self.token_delay):
+                return
+
+class ResponsePipeline:
+    """Runs a Responder on up to `max_concurrent` worker threads so the frame
+    loop never waits for a reply. Each request gets an empty bot message right
+    away; workers push chunks to a queue (plus a BOT_RESPONSE event to wake an
+    idle loop) and poll() appends them to that message on the main thread.
+    Requests still open after `timeout` seconds are cancelled and marked."""
+
+    def __init__(self, chat_window, responder, max_concurrent=BOT_MAX_CONCURRENT, timeout=BOT_TIMEOUT):
+        self.chat = chat_window
+        self.responder = responder
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrent), thread_name_prefix="bot")
+        self._results = queue.Queue()  # (request id, kind, payload)
+        self._pending = {}  # request id -> (message index, deadline, cancelled)
+        self._next_id = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def submit(self, prompt):
+        """Queue a reply to `prompt`; returns the request id."""
+        index = self.chat.add_message("bot", "")
+        self.chat.messages.pin(index)  # mensagem ainda vai mudar: não despejar no disco
+        cancelled = threading.Event()
+        rid = self._next_id
+        self._next_id += 1
+        self._pending[rid] = (index, time.perf_counter() + self.timeout, cancelled)
+        self._executor.submit(self._run, rid, prompt, cancelled)
+        return rid
+
+    def pending(self):
+        return len(self._pending)
+
+    def _run(self, rid, prompt, cancelled):
+        # roda na thread de trabalho: não toca no chat, só na fila
+        try:
+            for chunk in self.responder.respond(prompt, cancelled):
+                if cancelled.is_set():
+                    return
+                self._put(rid, "chunk", chunk)
+            self._put(rid, "done", None)
+        except Exception as exc:
+            self._put(rid, "error", str(exc) or type(exc).__name__)
+
+    def _put(self, rid, kind, payload):
+        self._results.put((rid, kind, payload))
+        try:
+            pygame.event.post(pygame.event.Event(BOT_RESPONSE, request=rid))
+        except pygame.error:
+            pass  # display já fechado; a fila basta
+
+    def poll(self):
+        """Apply queued results to the chat (main thread only) and expire
+        requests past their deadline. Returns True if the chat changed."""
+        chunks = {}  # request id -> partes chegadas neste quadro
+        finished = []
+        while True:
+            try:
+                rid, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if rid not in self._pending:
+                continue  # já expirou
+            if kind == "chunk":
+                chunks.setdefault(rid, []).append(payload)
+            else:
+                finished.append((rid, None if kind == "done" else f"[erro: {payload}]"))
+
+        # um re-wrap por mensagem, mesmo com vários pedaços no mesmo quadro
+        for rid, parts in chunks.items():
+            self.chat.append_to_message(self._pending[rid][0], "".join(parts))
+        for rid, note in finished:
+            if note is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._finish(rid, note)
+
+        now = time.perf_counter()
+        expired = [rid for rid, (_, deadline, _) in self._pending.items() if now >= deadline]
+        for rid in expired:
+            self.timed_out += 1
+            self._finish(rid, "[sem resposta: tempo esgotado]")
+        return bool(chunks or finished or expired)
+
+    def _finish(self, rid, note=None):
+        index, _, cancelled = self._pending.pop(rid)
+        cancelled.set()
+        if note is not None:
+            text = self.chat.messages.text(index)
+            self.chat.set_message_text(index, f"{text} {note}" if text else note)
+        self.chat.messages.unpin(index)
+
+    def next_timer(self):
+        """Seconds until the earliest request deadline, or None."""
+        if not self._pending:
+            return None
+        deadline = min(deadline for _, deadline, _ in self._pending.values())
+        return max(0.0, deadline - time.perf_counter())
+
+    def close(self):
+        for _, _, cancelled in self._pending.values():
+            cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
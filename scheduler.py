@@ -0,0 +1,75 @@
+# scheduler.py
+import time
+import pygame
+from config import FPS, IDLE_AFTER, IDLE_MAX_WAIT
+
+class FrameScheduler:
+    """Paces the main loop. Runs at full FPS while there is input or animation;
+    once idle it blocks on pygame.event.wait until the next pending timer
+    (cursor blink, game tick...) or the next event, whichever comes first.
+    A timer due within a frame (background work such as a relayout or a
+    paste in progress) is paced by clock.tick like an active frame."""
+
+    def __init__(self, fps=FPS, idle_after=IDLE_AFTER, max_wait=IDLE_MAX_WAIT):
+        self.fps = fps
+        self.idle_after = idle_after
+        self.max_wait = max_wait
+        self.clock = pygame.time.Clock()
+        now = time.perf_counter()
+        self._wake = now
+        self._last_activity = now
+        self.idle = False
+        self.frames = 0
+        self.effective_fps = float(fps)
+        self.time_asleep = 0.0
+        self.time_working = 0.0
+
+    def poke(self):
+        """Register activity: the loop goes back to full FPS."""
+        self._last_activity = time.perf_counter()
+
+    def wait_frame(self, next_timer=None, animating=False):
+        """Block until the next frame is due and return (events, dt).
+        next_timer: seconds until the earliest pending timer, or None."""
+        start = time.perf_counter()
+        self.time_working += start - self._wake
+        if animating:
+            self._last_activity = start
+        self.idle = start - self._last_activity >= self.idle_after
+
+        # timer já vencido (trabalho em segundo plano): ritmo de quadro, sem
+        # event.wait(1) girando a ~1000 fps
+        if self.idle and (next_timer is None or next_timer > 1.0 / self.fps):
+            timeout = self.max_wait if next_timer is None else min(self.max_wait, next_timer)
+            first = pygame.event.wait(max(1, int(timeout * 1000)))
+            events = [] if first.type == pygame.NOEVENT else [first]
+            events.extend(pygame.event.get())
+        else:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+
+        wake = time.perf_counter()
+        self.time_asleep += wake - start
+        dt = wake - self._wake
+        self._wake = wake
+        if events:
+            self._last_activity = wake
+        self.frames += 1
+        if dt > 0:
+            # média móvel exponencial da taxa de quadros real
+            self.effective_fps += (1.0 / dt - self.effective_fps) * 0.1
+        return events, dt
+
+    def sleep_ratio(self):
+        total = self.time_asleep + self.time_working
+        return 0.0 if total == 0 else self.time_asleep / total
+
+    def stats(self):
+        return {
+            "idle": self.idle,
+            "frames": self.frames,
+            "effective_fps": self.effective_fps,
+            "time_asleep": self.time_asleep,
+            "time_working": self.time_working,
+            "sleep_ratio": self.sleep_ratio(),
+        }
@@ -1,18 +1,44 @@
 # scrollable_panel.py
+import math
 import pygame
-from config import MARGIN, SCROLLBAR_WIDTH, SCROLLBAR_COLOR, SCROLLBAR_HANDLE_COLOR, BLACK
+from config import (
+    MARGIN, SCROLLBAR_WIDTH, SCROLLBAR_COLOR, SCROLLBAR_HANDLE_COLOR, BLACK,
+    SCROLL_LINES_PER_NOTCH, SCROLL_FRICTION, SCROLL_MIN_SPEED
+)
+from render_cache import shared_render_cache
+from text_wrap import get_width_cache
+
+_STALE = object()  # buffer row whose pixels are unknown
 
 class ScrollablePanel:
-    """Reusable scrollable panel. Holds lines as (text, color).
-    scroll is the index of the first visible line (top)."""
+    """Reusable scrollable panel. Holds lines as (text, color), or
+    (text, color, marks) where marks are (start, end, bg_color) character
+    spans painted behind the text (search highlights, selection).
+    scroll is the index of the first visible line (top) and scroll_px how
+    many pixels of it are scrolled out. A `kinetic` panel scrolls by pixels:
+    the wheel gives it momentum that update(dt) plays out; otherwise the
+    position moves by whole lines and scroll_px stays 0."""
 
-    def __init__(self, rect: pygame.Rect, line_height: int):
+    def __init__(self, rect: pygame.Rect, line_height: int, render_cache=None, kinetic=False):
         self.rect = rect
         self.line_height = line_height
         self.lines = []  # list[(text, color)]
         self.scroll = 0  # top index (first visible line)
+        self.scroll_px = 0.0  # pixels of the top line scrolled out (0 <= px < line_height)
+        self.kinetic = kinetic
+        self.velocity = 0.0  # px/s (positivo: desce)
         self.dragging = False
         self.drag_offset_delta = 0
+        self.draw_track = True  # False: o dono já desenha o trilho da barra
+        self._bar_key = None  # (rect, total, visible) da geometria em cache
+        self._bar_geometry = None
+        self.render_cache = render_cache if render_cache is not None else shared_render_cache
+        # back-buffer (see draw): contents survive between frames
+        self._buffer = None
+        self._drawn = []
+        self._drawn_start = None
+        self._drawn_font = None
+        self.rows_rendered = 0
 
     def set_rect(self, rect: pygame.Rect):
         self.rect = rect
@@ -22,6 +48,12 @@ class ScrollablePanel:
         self.lines = list(lines)
         self._ensure_scroll_bounds()
 
+    def set_line_source(self, source):
+        """Use `source` (any sequence of (text, color) supporting len and slicing)
+        as the lines without copying it. The owner keeps it up to date."""
+        self.lines = source
+        self._ensure_scroll_bounds()
+
     def add_lines(self, lines):
         self.lines.extend(lines)
         self._ensure_scroll_bounds()
@@ -38,64 +70,121 @@ class ScrollablePanel:
         visible = self.visible_lines_count()
         # desired top index to show last `visible` lines:
         self.scroll = max(0, total - visible)
+        self.scroll_px = 0.0
+        self.velocity = 0.0
         self._ensure_scroll_bounds()
 
+    def position(self):
+        """Scroll position in pixels from the top of the first line."""
+        return self.scroll * self.line_height + self.scroll_px
+
+    def max_position(self):
+        return max(0, len(self.lines) - self.visible_lines_count()) * self.line_height
+
+    def set_position(self, px):
+        """Scroll to `px` (clamped; rounded to whole lines unless kinetic)."""
+        lh = self.line_height
+        px = max(0.0, min(float(px), self.max_position()))
+        if not self.kinetic:
+            px = round(px / lh) * lh
+        line = int(px // lh)
+        self.scroll, self.scroll_px = line, px - line * lh
+
+    def is_animating(self):
+        return self.dragging or self.velocity != 0.0
+
+    def update(self, dt):
+        """Play out the wheel momentum. Returns True if the position moved."""
+        if self.velocity == 0.0 or dt <= 0:
+            return False
+        # decaimento exponencial exato: independe da taxa de quadros
+        decay = math.exp(-SCROLL_FRICTION * dt)
+        old = self.position()
+        self.set_position(old + self.velocity * (1.0 - decay) / SCROLL_FRICTION)
+        self.velocity *= decay
+        new = self.position()
+        if abs(self.velocity) < SCROLL_MIN_SPEED or new in (0.0, self.max_position()):
+            self.velocity = 0.0
+        return new != old
+
     def ensure_line_visible(self, index):
         """Ensure that the given line index (0..len-1) is visible.
         Adjusts self.scroll (top index) if necessary."""
         total = len(self.lines)
         visible = self.visible_lines_count()
+        self.velocity = 0.0
         if total <= visible:
             self.scroll = 0
+            self.scroll_px = 0.0
             return
         start = self.scroll
         end = start + visible
-        if index < start:
+        if index < start or (index == start and self.scroll_px):
             self.scroll = index
+            self.scroll_px = 0.0
         elif index >= end:
             self.scroll = index - visible + 1
+            self.scroll_px = 0.0
         self._ensure_scroll_bounds()
 
-    def _scrollbar_rects(self):
-        bar = pygame.Rect(self.rect.right + MARGIN, self.rect.y, SCROLLBAR_WIDTH, self.rect.height)
+    def hit_test(self, pos):
+        """(line, x) under the screen position `pos`: the line clamped to the
+        existing ones (the pointer may be above or below the panel) and x
+        relative to the start of the text. None without lines."""
+        if not len(self.lines):
+            return None
+        y = pos[1] - (self.rect.y + MARGIN) + self.scroll_px
+        line = self.scroll + int(y // self.line_height)
+        return max(0, min(line, len(self.lines) - 1)), pos[0] - (self.rect.x + MARGIN)
+
+    def _bar(self):
+        """(bar, handle height, handle travel): recomputed only when the
+        rect, the line count or the visible count change."""
         total = len(self.lines)
         visible = self.visible_lines_count()
-        if total <= visible:
-            handle = pygame.Rect(0, 0, 0, 0)
-        else:
-            handle_h = max(16, int(bar.height * (visible / total)))
-            max_off = max(0, total - visible)
-            ratio = 0 if max_off == 0 else (self.scroll / max_off)
-            handle_y = bar.y + ratio * (bar.height - handle_h)
-            handle = pygame.Rect(bar.x, int(handle_y), bar.width, int(handle_h))
-        return bar, handle
+        key = (tuple(self.rect), total, visible)
+        if key != self._bar_key:
+            bar = pygame.Rect(self.rect.right + MARGIN, self.rect.y, SCROLLBAR_WIDTH, self.rect.height)
+            handle_h = 0 if total <= visible else max(16, int(bar.height * (visible / total)))
+            self._bar_key = key
+            self._bar_geometry = (bar, handle_h, bar.height - handle_h)
+        return self._bar_geometry
+
+    def _scrollbar_rects(self):
+        bar, handle_h, travel = self._bar()
+        if handle_h == 0:
+            return bar, pygame.Rect(0, 0, 0, 0)
+        max_px = self.max_position()
+        ratio = 0 if max_px == 0 else self.position() / max_px
+        return bar, pygame.Rect(bar.x, int(bar.y + ratio * travel), bar.width, handle_h)
 
     def process_event(self, event):
         """Process wheel and drag of handle."""
-        bar, handle = self._scrollbar_rects()
-        total = len(self.lines)
-        visible = self.visible_lines_count()
-        max_off = max(0, total - visible)
-
         if event.type == pygame.MOUSEWHEEL:
             # wheel up: event.y >0 -> scroll up (show earlier lines) => decrease scroll
-            self.scroll = max(0, min(self.scroll - event.y, max_off))
+            notches = event.dict.get("precise_y", event.y)
+            if not self.kinetic:
+                self.set_position(self.position() - event.y * self.line_height)
+                return
+            impulse = -notches * SCROLL_LINES_PER_NOTCH * self.line_height * SCROLL_FRICTION
+            if impulse * self.velocity < 0:
+                self.velocity = 0.0  # inverteu o sentido: para antes
+            self.velocity += impulse
 
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            bar, handle = self._scrollbar_rects()
             if handle.height > 0 and handle.collidepoint(event.pos):
                 self.dragging = True
+                self.velocity = 0.0
                 self.drag_offset_delta = event.pos[1] - handle.y
 
         elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
             self.dragging = False
 
         elif event.type == pygame.MOUSEMOTION and self.dragging:
-            y_in_bar = event.pos[1] - (bar.y + self.drag_offset_delta)
-            y_in_bar = max(0, min(y_in_bar, bar.height - handle.height))
-            denom = (bar.height - handle.height)
-            ratio = 0 if denom == 0 else (y_in_bar / denom)
-            self.scroll = int(ratio * max_off)
-            self._ensure_scroll_bounds()
+            bar, handle_h, travel = self._bar()
+            y_in_bar = max(0, min(event.pos[1] - (bar.y + self.drag_offset_delta), travel))
+            self.set_position(0 if travel == 0 else y_in_bar / travel * self.max_position())
 
     def _ensure_scroll_bounds(self):
         total = len(self.lines)
@@ -103,41 +192,86 @@ class ScrollablePanel:
         max_off = max(0, total - visible)
         if self.scroll < 0:
             self.scroll = 0
-        elif self.scroll > max_off:
+            self.scroll_px = 0.0
+        elif self.scroll >= max_off:
             self.scroll = max_off
+            self.scroll_px = 0.0
 
-    def draw(self, font: pygame.font.Font, target_surface: pygame.Surface):
+    def _ensure_buffer(self):
+        """Back-buffer for the panel contents, recreated only when the size changes."""
         inner_w = max(1, self.rect.width - 2 * MARGIN)
-        inner_h = max(1, self.rect.height - 2 * MARGIN)
-        panel_surf = pygame.Surface((inner_w, inner_h))
-        panel_surf.fill(BLACK)
+        inner_h = max(1, self.rect.height - 2 * MARGIN) + self.line_height  # + a linha parcial de baixo
+        if self._buffer is None or self._buffer.get_size() != (inner_w, inner_h):
+            self._buffer = pygame.Surface((inner_w, inner_h))
+            self._buffer.fill(BLACK)
+            self._drawn = []
+            self._drawn_start = None
+        return self._buffer
 
-        visible = self.visible_lines_count()
-        start = max(0, min(self.scroll, max(0, len(self.lines) - visible)))
-        end = start + visible
+    def _repaint_row(self, buf, font, row, lines):
+        """Repaint row `row` of the buffer. Glyphs may be taller than line_height,
+        so the row above is re-blitted too for the part that overhangs into it."""
+        y = row * self.line_height
+        h = self.line_height if row < len(self._drawn) else buf.get_height() - y
+        if h <= 0:
+            return
+        area = pygame.Rect(0, y, buf.get_width(), h)
+        buf.set_clip(area)
+        buf.fill(BLACK, area)
+        if row < len(lines) and len(lines[row]) > 2:
+            xs = get_width_cache(font).prefix_widths(lines[row][0])
+            for start, end, bg in lines[row][2]:
+                buf.fill(bg, (xs[start], y, xs[end] - xs[start], self.line_height))
+        for r in (row - 1, row):
+            if 0 <= r < len(lines):
+                text, color = lines[r][:2]
+                buf.blit(self.render_cache.render(font, text, color), (0, r * self.line_height))
+        buf.set_clip(None)
+
+    def draw(self, font: pygame.font.Font, target_surface: pygame.Surface):
+        buf = self._ensure_buffer()
+        # uma linha a mais: com scroll_px > 0 ela aparece embaixo
+        visible = self.visible_lines_count() + 1
+        start = max(0, min(self.scroll, max(0, len(self.lines) - visible + 1)))
+        lines = self.lines[start:start + (visible if self.scroll_px else visible - 1)]
+
+        # _drawn[r] = line (text, color) currently in buffer row r (None = empty row)
+        drawn = self._drawn
+        if font is not self._drawn_font or len(drawn) != visible:
+            self._drawn_font = font
+            drawn = [_STALE] * visible
+        elif self._drawn_start is not None and start != self._drawn_start:
+            # rolagem: desloca o buffer e só as linhas expostas são renderizadas
+            d = start - self._drawn_start
+            if abs(d) < visible:
+                buf.scroll(0, -d * self.line_height)
+                drawn = drawn[d:] + [_STALE] * d if d > 0 else [_STALE] * -d + drawn[:d]
+            else:
+                drawn = [_STALE] * visible
+        repaint = set()
+        if drawn is not self._drawn:
+            repaint.add(visible)  # sobra abaixo da última linha
+        self._drawn = drawn
+        self._drawn_start = start
+
+        for r in range(visible):
+            line = lines[r] if r < len(lines) else None
+            if drawn[r] is _STALE or drawn[r] != line:
+                drawn[r] = line
+                repaint.add(r)
+                repaint.add(r + 1)  # a linha de baixo recebe a sobra dos glifos
+        for r in sorted(repaint):
+            self._repaint_row(buf, font, r, lines)
+        self.rows_rendered += len(repaint)
 
-        y = 0
-        for text, color in self.lines[start:end]:
-            try:
-                # se a string está vazia, renderizamos um espaço para evitar erro
-                if not text:
-                    rendered = font.render(" ", True, color)
-                else:
-                    rendered = font.render(text, True, color)
-            except Exception:
-                # fallback: remover caracteres estranhos
-                safe = ''.join(ch for ch in text if 32 <= ord(ch) < 0x10FFFF)
-                if not safe:
-                    safe = " "  # evita zero width
-                rendered = font.render(safe, True, color)
-
-            panel_surf.blit(rendered, (0, y))
-            y += self.line_height
-
-        target_surface.blit(panel_surf, (self.rect.x + MARGIN, self.rect.y + MARGIN))
+        # rolagem por pixel só muda o recorte do buffer: nada é renderizado
+        inner_h = buf.get_height() - self.line_height
+        target_surface.blit(buf, (self.rect.x + MARGIN, self.rect.y + MARGIN),
+                            pygame.Rect(0, int(self.scroll_px), buf.get_width(), inner_h))
 
         # scrollbar
         bar, handle = self._scrollbar_rects()
-        pygame.draw.rect(target_surface, SCROLLBAR_COLOR, bar)
+        if self.draw_track:
+            pygame.draw.rect(target_surface, SCROLLBAR_COLOR, bar)
         if handle.height > 0:
             pygame.draw.rect(target_surface, SCROLLBAR_HANDLE_COLOR, handle)
\ No newline at end of file
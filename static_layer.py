@@ -0,0 +1,48 @@
+# static_layer.py
+import pygame
+from config import BLACK, BORDER_COLOR, BORDER_WIDTH, MARGIN, SCROLLBAR_COLOR
+
+SEND_BUTTON_COLOR = (0, 128, 0)
+
+class StaticLayer:
+    """Everything of the window that only changes with its size: background,
+    area borders, the two info titles, scrollbar tracks and the send button.
+    It is composed once per layout size and restored with a single blit per
+    frame (or per dirty rect); widgets draw only their dynamic content on top."""
+
+    def __init__(self, layout, font):
+        self.layout = layout
+        self.font = font
+        self.surface = None
+        self.builds = 0  # estatística: recomposições
+        layout.subscribe(lambda layout: self.invalidate())
+
+    def invalidate(self):
+        self.surface = None
+
+    def _build(self):
+        layout = self.layout
+        surf = pygame.Surface(layout.size)
+        surf.fill(BLACK)
+        for rect in (layout.player, layout.chat, layout.game):
+            pygame.draw.rect(surf, BORDER_COLOR, rect, BORDER_WIDTH)
+        pygame.draw.rect(surf, BORDER_COLOR, layout.input, 2)
+        for rect, title, color in ((layout.player, "Informações do Jogador", (0, 200, 0)),
+                                   (layout.game, "Informações do Jogo", (200, 0, 0))):
+            surf.blit(self.font.render(title, True, color), (rect.x + MARGIN, rect.y + MARGIN))
+        for bar in (layout.chat_scrollbar, layout.input_scrollbar):
+            pygame.draw.rect(surf, SCROLLBAR_COLOR, bar)
+        pygame.draw.rect(surf, SEND_BUTTON_COLOR, layout.send_button)
+        label = self.font.render("Enviar", True, (255, 255, 255))
+        surf.blit(label, label.get_rect(center=layout.send_button.center))
+        self.builds += 1
+        return surf
+
+    def draw(self, target, rect=None):
+        """Restore the static pixels of `rect` (None = the whole window)."""
+        if self.surface is None or self.surface.get_size() != self.layout.size:
+            self.surface = self._build()
+        if rect is None:
+            target.blit(self.surface, (0, 0))
+        else:
+            target.blit(self.surface, rect, rect)
@@ -0,0 +1,17 @@
+# conftest.py
+import os
+import sys
+
+# sem janela: SDL desenha num display falso
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+@pytest.fixture(scope="session", autouse=True)
+def display():
+    pygame.init()
+    yield pygame.display.set_mode((900, 600))
+    pygame.quit()
@@ -0,0 +1,35 @@
+# test_chat_search.py
+import random
+import time
+from chat_search import ChatSearch, TrigramIndex
+from message_store import MessageStore
+
+def test_candidates_match_set_intersection():
+    rng = random.Random(4)
+    index = TrigramIndex()
+    texts = ["".join(rng.choice("abcde ") for _ in range(rng.randrange(3, 40))) for _ in range(2000)]
+    for i, text in enumerate(texts):
+        index.add(i, text)
+    for query in ("abc", "dead", "a b", "eeee", "zzz"):
+        expected = [i for i, text in enumerate(texts) if query in text]
+        found = index.candidates(query)
+        assert found == sorted(found)
+        assert set(expected) <= set(found)
+    assert index.candidates("ab") is None
+
+def test_search_finds_indexed_and_queued_messages():
+    store = MessageStore()
+    search = ChatSearch(store)
+    for i in range(500):
+        text = f"mensagem {i}" + (" raposa" if i % 50 == 0 else "")
+        search.add(store.append("bot", text, 1), text)
+    search.index_pending(budget=0.0)  # indexa só um pouco; o resto fica na fila
+    assert search.pending()
+    search.start("raposa")
+    deadline = time.time() + 5
+    while search.running and time.time() < deadline:
+        search.poll()
+        time.sleep(0.01)
+    assert search.matches == list(range(0, 500, 50))
+    search.close()
+    store.close()
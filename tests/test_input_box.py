@@ -0,0 +1,154 @@
+# test_input_box.py
+import random
+import pygame
+from config import WHITE
+from chat_window import ChatWindow
+import input_box
+from input_box import InputBox
+
+def make_box():
+    surface = pygame.Surface((900, 600))
+    return InputBox(surface, ChatWindow(surface))
+
+def settle(box):
+    """Finish the rows left provisional by a capped re-wrap."""
+    while box._todo_count:
+        box._rewrap_slice()
+
+def row_state(box):
+    index = box._row_index
+    return (box._para_rows, [index.start(p) for p in range(len(index) + 1)],
+            box.text_lines[:], box.panel.lines[:])
+
+def reflowed(box):
+    """Visual-line index of `box` rebuilt from scratch."""
+    settle(box)
+    saved = (box._para_rows, box._para_todo, box._row_index)
+    state = row_state(box)
+    box._reflow_all()
+    ref = row_state(box)
+    box._para_rows, box._para_todo, box._row_index = saved
+    return state, ref
+
+def visible_part_is_final(box):
+    """Only rows past a screen below the cursor may be provisional."""
+    p = box.buffer.line_of(box.cursor_offset)
+    first = box.cursor_line - box._row_index.start(p)
+    return all(t is None or (q == p and t > first + box.panel.visible_lines_count())
+               for q, t in enumerate(box._para_todo))
+
+def final_rows_are_wrapped(box):
+    """Rows before the first provisional one match a fresh wrap."""
+    for p, t in enumerate(box._para_todo):
+        rows = box._para_rows[p]
+        n = len(rows) if t is None else t
+        if rows[:n] != box._wrap_paragraph(box.buffer.line_text(p))[:n]:
+            return False
+    return True
+
+def test_incremental_rewrap_matches_full_reflow():
+    rng = random.Random(7)
+    box = make_box()
+    alphabet = "aaaa bbb  cc d\nWWWWW xxxxxxxxxxxxxxxxxxxx   "
+    for _ in range(250):
+        size = len(box.buffer)
+        if size == 0 or rng.random() < 0.6:
+            box._set_cursor_offset(rng.randrange(size + 1))
+            if rng.random() < 0.1:
+                text = "y" * rng.randrange(50, 400)  # palavra maior que a linha
+            else:
+                text = "".join(rng.choice(alphabet) for _ in range(rng.choice((1, 1, 3, 10, 80, 400))))
+            box._insert_text(text)
+        else:
+            start = rng.randrange(size)
+            box._delete_range(start, start + rng.choice((1, 1, 2, 5, 40, 300)))
+        assert visible_part_is_final(box)
+        state, ref = reflowed(box)
+        assert state == ref
+
+def test_edits_over_provisional_rows_match_full_reflow(monkeypatch):
+    monkeypatch.setattr(input_box, "_TEXT_WINDOW", 16)  # linhas atravessam as janelas
+    rng = random.Random(11)
+    box = make_box()
+    box._insert_text(("abcd " * 400 + "\n") * 3)
+    for _ in range(150):
+        size = len(box.buffer)
+        if rng.random() < 0.6:
+            box._set_cursor_offset(rng.randrange(size + 1))
+            box._insert_text(rng.choice(("y", "yy ", "\n", "abcd " * 30, "  " * 20, "z" * 150)))
+        else:
+            start = rng.randrange(size)
+            box._delete_range(start, start + rng.choice((1, 2, 6, 200)))
+        if rng.random() < 0.3:
+            box._rewrap_slice(budget=0.0)  # só uma linha de um parágrafo pendente
+        # provisórias ou não, as linhas cobrem o texto em ordem
+        assert "".join(box.text_lines[:]).replace(" ", "") == box.buffer.text().replace(" ", "").replace("\n", "")
+        assert box._todo_count == sum(t is not None for t in box._para_todo)
+        assert final_rows_are_wrapped(box)
+    assert box._todo_count
+    state, ref = reflowed(box)
+    assert state == ref
+
+def test_single_paragraph_paste_matches_full_reflow():
+    rng = random.Random(3)
+    box = make_box()
+    box._insert_text("começo ")
+    box._set_cursor_offset(3)
+    box._queue_paste(" ".join("".join(rng.choice("abcdefgh") for _ in range(rng.randrange(1, 9)))
+                              for _ in range(3000)))
+    while box._paste_pending():
+        box.update(1.0 / 60)
+    state, ref = reflowed(box)
+    assert state == ref
+
+def test_long_cascade_wraps_the_screen_now_and_the_rest_in_update():
+    box = make_box()
+    box._insert_text("abcd " * 6000)
+    rows_before = len(box.text_lines)
+    box._set_cursor_offset(0)
+    # uma letra no começo desloca todas as quebras do parágrafo
+    box._insert_text("y")
+    assert box._todo_count == 1
+    assert box._para_todo[0] <= box.panel.visible_lines_count() + 3
+    assert visible_part_is_final(box)
+    # linhas provisórias cobrem o texto todo, em ordem
+    assert "".join(box.text_lines[:]).replace(" ", "") == box.buffer.text().replace(" ", "")
+    assert abs(len(box.text_lines) - rows_before) <= 1
+    assert box.next_timer() == 0.0
+    while box._todo_count:
+        box.update(0.0)
+    assert box.next_timer() != 0.0
+    state, ref = reflowed(box)
+    assert state == ref
+
+def test_resize_wraps_the_screen_now_and_the_rest_in_update():
+    box = make_box()
+    text = ("palavra comprida " * 200 + "\n") * 10 + "palavra comprida " * 3000
+    box._insert_text(text)
+    box._set_cursor_offset(len(text) - 1000)  # fundo de um parágrafo longo
+    box._auto_scroll_to_cursor()
+    box.layout.resize((700, 600))
+    assert box._todo_count and box.next_timer() == 0.0
+    width = box._wrap_width()
+    panel = box.panel
+    visible = panel.lines[panel.scroll:panel.scroll + panel.visible_lines_count()]
+    assert all(box.width_cache.measure(t) <= width for t, _ in visible)
+    assert 0 <= box.cursor_line - panel.scroll < panel.visible_lines_count()
+    while box._todo_count:
+        box.update(0.0)
+    assert 0 <= box.cursor_line - panel.scroll < panel.visible_lines_count()
+    state, ref = reflowed(box)
+    assert state == ref
+
+def test_cursor_moves_along_a_row_without_measuring():
+    box = make_box()
+    box._insert_text("uma linha com algumas palavras")
+    box._cursor_x()  # posições da linha entram no cache
+    calls = []
+    measure = box.width_cache.measure
+    box.width_cache.measure = lambda text: calls.append(text) or measure(text)
+    for _ in range(10):
+        box.process_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_LEFT, unicode="", mod=0))
+        x = box._cursor_x()
+    assert calls == []
+    assert abs(x - box.font.size(box.text_lines[0][:box.cursor_col])[0]) <= 1
@@ -0,0 +1,47 @@
+# test_message_store.py
+import random
+import pytest
+from message_store import LineIndex, MessageStore, _meta_sender, _pack_meta
+
+def test_more_than_256_senders_survive_reopen(tmp_path):
+    path = str(tmp_path / "chat")
+    store = MessageStore(path)
+    for i in range(300):
+        store.append(f"u{i}", f"texto {i}", i % 2)
+    assert store.sender(299) == "u299"
+    store.close()
+    store = MessageStore(path)
+    assert [store.sender(i) for i in (0, 43, 255, 256, 299)] == ["u0", "u43", "u255", "u256", "u299"]
+    assert [store.color_index(i) for i in (255, 256, 299)] == [1, 0, 1]
+    assert store.text(299) == "texto 299"
+    store.close()
+
+def test_sender_field_keeps_24_bits_apart_from_color():
+    for sid in (0, 255, 256, 0x7FFF00, 0xFFFFFF):
+        meta = _pack_meta(sid, 200) | 12345
+        assert _meta_sender(meta) == sid
+        assert (meta >> 40) & 0xFF == 200
+
+def test_out_of_range_color_is_rejected():
+    store = MessageStore()
+    with pytest.raises(ValueError):
+        store.append("user", "oi", 256)
+    store.close()
+
+def test_line_index_splice_matches_appends():
+    rng = random.Random(5)
+    counts = [rng.randrange(1, 6) for _ in range(37)]
+    index = LineIndex()
+    index.splice(0, 0, counts)
+    for _ in range(40):
+        i = rng.randrange(len(counts) + 1)
+        old = rng.randrange(0, 3) if i < len(counts) else 0
+        new = [rng.randrange(1, 6) for _ in range(rng.randrange(0, 4))]
+        counts[i:i + old] = new
+        index.splice(i, old, new)
+        ref = LineIndex()
+        for c in counts:
+            ref.append(c)
+        assert list(index.counts) == counts and index.total == sum(counts)
+        assert [index.start(k) for k in range(len(counts) + 1)] == [ref.start(k) for k in range(len(counts) + 1)]
+        assert [index.find(line) for line in range(index.total)] == [ref.find(line) for line in range(ref.total)]
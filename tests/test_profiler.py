@@ -0,0 +1,26 @@
+# test_profiler.py
+import pygame
+from profiler import Profiler, ProfilerOverlay
+
+def test_gauge_records_level_and_overlay_shows_it():
+    profiler = Profiler()
+    queue = [7, 7, 3]  # fila parada em 7, depois drena para 3
+    profiler.add_gauge("chat_backlog", lambda: queue[0])
+    profiler.enable()
+    for level in queue:
+        queue[0] = level
+        profiler.begin_frame()
+        profiler.end_frame()
+    assert [f["gauges"]["chat_backlog"] for f in profiler.frames] == [7, 7, 3]
+    overlay = ProfilerOverlay(profiler)
+    assert "chat_backlog 3 (max 7)" in overlay._summary(list(profiler.frames))
+    overlay.draw(pygame.Surface((900, 600)))
+
+def test_trace_path_is_shown_in_overlay(tmp_path):
+    profiler = Profiler()
+    profiler.enable()
+    profiler.begin_frame()
+    profiler.end_frame()
+    path = profiler.dump_trace(str(tmp_path / "trace.json"))
+    assert profiler.last_trace == path
+    assert "trace: trace.json" in ProfilerOverlay(profiler)._summary(list(profiler.frames))
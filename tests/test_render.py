@@ -0,0 +1,65 @@
+# test_render.py
+import pygame
+from config import FONT_SIZE
+from fonts import get_font
+from chat_window import ChatWindow
+from input_box import InputBox
+from gui_regions import GUIRegions
+from renderer import Renderer
+
+FRAME_DT = 1.0 / 60
+
+def make_window(mode, size=(900, 600)):
+    """Widgets and a renderer over their own offscreen surface."""
+    surface = pygame.Surface(size)
+    chat = ChatWindow(surface)
+    box = InputBox(surface, chat)
+    regions = GUIRegions(surface, chat, box)
+    return surface, chat, box, Renderer(surface, get_font(FONT_SIZE), chat, box, regions, mode)
+
+def type_text(box, text):
+    for ch in text:
+        box.process_event(pygame.event.Event(pygame.KEYDOWN, key=0, unicode=ch, mod=0))
+
+def run_frames(windows, frames, active_area, each_frame=None):
+    """Step every window in lockstep; return the frames whose pixels differ."""
+    mismatches = []
+    for frame in range(frames):
+        for surface, chat, box, renderer in windows:
+            if each_frame is not None:
+                each_frame(frame, chat, box)
+            box.update(FRAME_DT)
+            chat.update(FRAME_DT)
+            renderer.render(active_area)
+        full, dirty = (pygame.image.tobytes(w[0], "RGB") for w in windows)
+        if full != dirty:
+            mismatches.append(frame)
+    return mismatches
+
+def test_cursor_blink_dirty_matches_full():
+    windows = [make_window("full"), make_window("dirty")]
+    for window in windows:
+        type_text(window[2], "ola mundo")
+    # 0.5 s por piscada: 8 trocas do cursor
+    assert run_frames(windows, 240, 'input') == []
+
+def test_chat_activity_dirty_matches_full():
+    windows = [make_window("full"), make_window("dirty")]
+    for window in windows:
+        type_text(window[2], "rascunho")
+
+    def each_frame(frame, chat, box):
+        if frame % 7 == 0:
+            chat.add_message("user" if frame % 2 else "bot", f"mensagem {frame} " + "palavra " * (frame % 30))
+        if frame == 90:
+            chat.set_search_active(True)
+            chat.set_search_query("palavra")
+        if frame == 150:
+            chat.process_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=2, precise_y=2.0))
+        if frame % 11 == 0:
+            # retângulo sujo do tamanho do cursor sobre a borda destacada do chat
+            rect = chat.get_chat_rect()
+            chat.mark_dirty(pygame.Rect(rect.x + 1, rect.y + 40 + frame % 50, 5, 12))
+
+    # o cursor da input continua piscando com o chat ativo
+    assert run_frames(windows, 240, 'chat', each_frame) == []
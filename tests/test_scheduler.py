@@ -0,0 +1,13 @@
+# test_scheduler.py
+import time
+from scheduler import FrameScheduler
+
+def test_due_timer_runs_at_frame_pace_when_idle():
+    scheduler = FrameScheduler(fps=60, idle_after=0.0)
+    scheduler.wait_frame(next_timer=0.0)
+    start = time.perf_counter()
+    for _ in range(10):
+        scheduler.wait_frame(next_timer=0.0)
+    assert scheduler.idle
+    # 10 quadros a 60 fps: ~166 ms, não 10 esperas de 1 ms
+    assert time.perf_counter() - start >= 0.12
@@ -0,0 +1,35 @@
+# test_text_buffer.py
+import random
+from text_buffer import Rope
+
+def walk(node, depth=1):
+    """Yield (node, depth) of a treap."""
+    if node is None:
+        return
+    yield node, depth
+    yield from walk(node.left, depth + 1)
+    yield from walk(node.right, depth + 1)
+
+def test_random_edits_keep_text_and_heap_order():
+    rng = random.Random(11)
+    rope, model = Rope(), ""
+    for _ in range(3000):
+        if model and rng.random() < 0.3:
+            start = rng.randrange(len(model))
+            end = start + rng.randrange(1, 600)
+            rope.delete(start, end)
+            model = model[:start] + model[end:]
+        else:
+            # textos grandes forçam cortes no meio de nós (_split)
+            offset = rng.randrange(len(model) + 1)
+            text = "".join(rng.choice("ab c\n") for _ in range(rng.choice((1, 5, 300, 900))))
+            rope.insert(offset, text)
+            model = model[:offset] + text + model[offset:]
+    assert rope.text() == model
+    assert rope.line_count() == model.count("\n") + 1
+    nodes = list(walk(rope._root))
+    for node, _ in nodes:
+        for child in (node.left, node.right):
+            assert child is None or child.prio <= node.prio
+    # treap balanceado: profundidade O(log n)
+    assert max(depth for _, depth in nodes) <= 4 * len(nodes).bit_length()
@@ -0,0 +1,19 @@
+# test_text_wrap.py
+import random
+from config import FONT_SIZE
+from fonts import get_font
+from text_wrap import WidthCache, wrap_text
+
+WORDS = ("idle", "fox", "AVAVAV", "To", "Wa", "Informações", "ffi", "🦊", "a", "llll", "WWW",
+         "supercalifragilistic")
+
+def test_wrapped_rows_fit_when_rendered():
+    rng = random.Random(2)
+    cache = WidthCache(get_font(FONT_SIZE))
+    for _ in range(500):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randrange(1, 60)))
+        max_w = rng.randrange(40, 500)
+        rows = wrap_text(text, max_w, cache)
+        # só uma palavra sozinha pode passar (quebrada por caractere, já medida)
+        assert all(cache.measure(row) <= max_w for row in rows if " " in row)
+        assert "".join(rows).replace(" ", "") == text.replace(" ", "")
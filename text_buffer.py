@@ -0,0 +1,187 @@
+# text_buffer.py
+import random
+
+CHUNK_SIZE = 256  # max chars per rope leaf
+
+class _Node:
+    __slots__ = ("text", "nl", "prio", "left", "right", "size", "lines")
+
+    def __init__(self, text):
+        self.text = text
+        self.nl = text.count("\n")  # newlines in this node's own text
+        self.prio = random.random()
+        self.left = None
+        self.right = None
+        self.size = len(text)  # chars in the subtree
+        self.lines = self.nl  # newlines in the subtree
+
+def _pull(node):
+    node.size = len(node.text)
+    node.lines = node.nl
+    if node.left is not None:
+        node.size += node.left.size
+        node.lines += node.left.lines
+    if node.right is not None:
+        node.size += node.right.size
+        node.lines += node.right.lines
+    return node
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prio > b.prio:
+        a.right = _merge(a.right, b)
+        return _pull(a)
+    b.left = _merge(a, b.left)
+    return _pull(b)
+
+def _split(node, k):
+    """Split into (first k chars, rest)."""
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left is not None else 0
+    if k <= left_size:
+        a, b = _split(node.left, k)
+        node.left = b
+        return a, _pull(node)
+    k -= left_size
+    if k >= len(node.text):
+        a, b = _split(node.right, k - len(node.text))
+        node.right = a
+        return _pull(node), b
+    # corte no meio do texto do nó: as metades herdam a prioridade dele,
+    # senão a ordem de heap com as subárvores se perde
+    head, tail = _Node(node.text[:k]), _Node(node.text[k:])
+    head.prio = tail.prio = node.prio
+    head.left, tail.right = node.left, node.right
+    return _pull(head), _pull(tail)
+
+def _build(text):
+    root = None
+    for i in range(0, len(text), CHUNK_SIZE):
+        root = _merge(root, _Node(text[i:i + CHUNK_SIZE]))
+    return root
+
+class Rope:
+    """Text buffer as a treap of string chunks. Insert, delete and
+    offset <-> line lookups are O(log n); lines are split on '\\n'."""
+
+    def __init__(self, text=""):
+        self._root = _build(text)
+
+    def __len__(self):
+        return self._root.size if self._root is not None else 0
+
+    def __str__(self):
+        return self.text()
+
+    def line_count(self):
+        return (self._root.lines if self._root is not None else 0) + 1
+
+    def insert(self, offset, text):
+        if not text:
+            return
+        offset = max(0, min(offset, len(self)))
+        if len(text) < CHUNK_SIZE and self._insert_in_leaf(self._root, offset, text):
+            return
+        a, b = _split(self._root, offset)
+        self._root = _merge(_merge(a, _build(text)), b)
+
+    def _insert_in_leaf(self, node, offset, text):
+        """Fast path for typing: grow an existing chunk in place."""
+        if node is None:
+            return False
+        left_size = node.left.size if node.left is not None else 0
+        if offset < left_size:
+            done = self._insert_in_leaf(node.left, offset, text)
+        elif offset <= left_size + len(node.text) and len(node.text) + len(text) <= CHUNK_SIZE:
+            j = offset - left_size
+            node.text = node.text[:j] + text + node.text[j:]
+            node.nl = node.text.count("\n")
+            done = True
+        elif offset > left_size + len(node.text):
+            done = self._insert_in_leaf(node.right, offset - left_size - len(node.text), text)
+        else:
+            return False
+        if done:
+            _pull(node)
+        return done
+
+    def delete(self, start, end):
+        start = max(0, start)
+        end = min(end, len(self))
+        if start >= end:
+            return
+        a, rest = _split(self._root, start)
+        _, c = _split(rest, end - start)
+        self._root = _merge(a, c)
+
+    def text(self, start=0, end=None):
+        end = len(self) if end is None else min(end, len(self))
+        out = []
+        self._collect(self._root, max(0, start), end, out)
+        return "".join(out)
+
+    def _collect(self, node, start, end, out):
+        if node is None or start >= end:
+            return
+        left_size = node.left.size if node.left is not None else 0
+        if start < left_size:
+            self._collect(node.left, start, min(end, left_size), out)
+        own_end = left_size + len(node.text)
+        if start < own_end and end > left_size:
+            out.append(node.text[max(0, start - left_size):min(len(node.text), end - left_size)])
+        if end > own_end:
+            self._collect(node.right, max(0, start - own_end), end - own_end, out)
+
+    def line_start(self, line):
+        """Offset of the first char of line `line` (0-based)."""
+        if line <= 0:
+            return 0
+        node, j, pos = self._root, line - 1, 0  # procura o j-ésimo '\n'
+        while node is not None:
+            left = node.left
+            if left is not None and j < left.lines:
+                node = left
+                continue
+            if left is not None:
+                j -= left.lines
+                pos += left.size
+            if j < node.nl:
+                idx = -1
+                for _ in range(j + 1):
+                    idx = node.text.index("\n", idx + 1)
+                return pos + idx + 1
+            j -= node.nl
+            pos += len(node.text)
+            node = node.right
+        return len(self)
+
+    def line_end(self, line):
+        """Offset just past the last char of line `line` (before its '\\n')."""
+        if line + 1 >= self.line_count():
+            return len(self)
+        return self.line_start(line + 1) - 1
+
+    def line_text(self, line):
+        return self.text(self.line_start(line), self.line_end(line))
+
+    def line_of(self, offset):
+        """Line index containing `offset` (number of '\\n' before it)."""
+        node, count = self._root, 0
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if offset <= left_size:
+                node = node.left
+                continue
+            if node.left is not None:
+                count += node.left.lines
+            offset -= left_size
+            if offset <= len(node.text):
+                return count + node.text.count("\n", 0, offset)
+            count += node.nl
+            offset -= len(node.text)
+            node = node.right
+        return count
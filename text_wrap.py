@@ -0,0 +1,199 @@
+# text_wrap.py
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+import pygame
+from config import WIDTH_CACHE_WORDS, WIDTH_CACHE_LINES
+
+# a cada quantos caracteres prefix_widths mede o prefixo exato
+_PREFIX_STEP = 8
+
+class WidthCache:
+    """Per-font cache of character and word advances in pixels, so wrapping
+    does not call font.size again for text it has already measured.
+
+    Fonts advance by fractional pixels, so summing per-char widths drifts from
+    what font.render draws; prefix positions are therefore found by bisecting
+    font.size over prefixes (O(log n) measurements) instead."""
+
+    def __init__(self, font: pygame.font.Font, max_words=WIDTH_CACHE_WORDS, max_lines=WIDTH_CACHE_LINES):
+        self.font = font
+        self.max_words = max(1, max_words)
+        self.max_lines = max(1, max_lines)
+        self._chars = {}
+        self._words = {}
+        self._prefixes = OrderedDict()  # texto -> array de posições x (LRU)
+        # média de muitos espaços para capturar o avanço fracionário
+        self.space_width = self.measure(" " * 32) / 32
+
+    def measure(self, text):
+        """Exact width of `text` as rendered by the font (uncached)."""
+        return self.font.size(text)[0]
+
+    def char_width(self, ch):
+        w = self._chars.get(ch)
+        if w is None:
+            w = self._chars[ch] = self.measure(ch)
+        return w
+
+    def word_width(self, word):
+        w = self._words.get(word)
+        if w is None:
+            if len(word) == 1:
+                return self.char_width(word)
+            if len(self._words) >= self.max_words:
+                self._words.clear()
+            w = self._words[word] = self.measure(word)
+        return w
+
+    def text_width(self, text):
+        """Width of `text` from cached word advances (approximate across spaces)."""
+        words = text.split(" ")
+        return sum(self.word_width(w) for w in words if w) + self.space_width * (len(words) - 1)
+
+    def fit_chars(self, text, max_w, pos=0):
+        """Largest n such that text[pos:pos + n] fits in max_w pixels. Gallops
+        to an overflowing prefix, then bisects font.size inside it, so the cost
+        is bounded by the row length rather than len(text)."""
+        avail = len(text) - pos
+        lo, hi = 0, 16
+        while hi < avail and self.measure(text[pos:pos + hi]) <= max_w:
+            lo, hi = hi, hi * 2
+        hi = min(hi, avail)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.measure(text[pos:pos + mid]) <= max_w:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def prefix_widths(self, text):
+        """x of every character boundary of `text` (len(text) + 1 entries,
+        ascending), cached per text. The prefix is measured exactly every
+        _PREFIX_STEP characters; in between, cached char advances are scaled
+        to land on those measurements, so the sum never drifts."""
+        widths = self._prefixes.get(text)
+        if widths is not None:
+            self._prefixes.move_to_end(text)
+            return widths
+        widths = array('i', [0])
+        x = 0
+        for a in range(0, len(text), _PREFIX_STEP):
+            b = min(a + _PREFIX_STEP, len(text))
+            end = self.measure(text[:b])
+            advances = [self.char_width(ch) for ch in text[a:b]]
+            scale = (end - x) / (sum(advances) or 1)
+            acc = x
+            for w in advances[:-1]:
+                acc += w * scale
+                widths.append(round(acc))
+            widths.append(end)
+            x = end
+        self._prefixes[text] = widths
+        if len(self._prefixes) > self.max_lines:
+            self._prefixes.popitem(last=False)
+        return widths
+
+    def index_at(self, text, x):
+        """Character boundary of `text` nearest to `x` pixels from its start:
+        a bisect over prefix_widths, no measuring once the line is cached."""
+        widths = self.prefix_widths(text)
+        i = bisect_left(widths, x)
+        if i >= len(widths):
+            return len(text)
+        if i > 0 and x - widths[i - 1] < widths[i] - x:
+            i -= 1
+        return i
+
+_width_caches = {}
+
+def get_width_cache(font):
+    """Shared WidthCache for `font` (one per font object)."""
+    cache = _width_caches.get(font)
+    if cache is None:
+        cache = _width_caches[font] = WidthCache(font)
+    return cache
+
+def find_break(text, max_w, cache, pos=0):
+    """Index (relative to `pos`) where text[pos:] must be broken to fit max_w
+    pixels, or None if it fits. Breaks after the last space before the
+    overflow char, else at the overflow char itself (always at least one
+    char, so callers make progress)."""
+    fit = cache.fit_chars(text, max_w, pos)
+    if pos + fit >= len(text):
+        return None
+    overflow_pos = pos + max(1, fit)
+    space = text.rfind(" ", pos, overflow_pos)
+    return (space + 1 if space >= 0 else overflow_pos) - pos
+
+def iter_spans(text, max_w, cache, pos=0):
+    """Rows of a single paragraph as (start, end) spans of `text`, wrapping
+    from the row that starts at `pos`. Spaces at a break are not part of
+    either row (end of one row < start of next). Works on indices, so each
+    row costs its own length, and stopping early skips the rest."""
+    while True:
+        split_at = find_break(text, max_w, cache, pos)
+        if split_at is None:
+            yield pos, len(text)
+            return
+        cut = pos + split_at
+        yield pos, pos + len(text[pos:cut].rstrip())
+        pos = cut
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+
+def wrap_spans(text, max_w, cache):
+    """Wrap a single paragraph into rows given as (start, end) spans of `text`."""
+    return list(iter_spans(text, max_w, cache))
+
+def _fit_row(words, max_w, cache):
+    """Join `words` into a row and confirm it with font.size, dropping words
+    from the end (one always stays) while it is wider than max_w. Returns
+    (row, number of words used)."""
+    n = len(words)
+    row = " ".join(words)
+    while n > 1 and cache.measure(row) > max_w:
+        n -= 1
+        row = " ".join(words[:n])
+    return row, n
+
+def wrap_text(text, max_w, cache):
+    """Greedy word wrap of a single paragraph (no newlines) to max_w pixels.
+    Words wider than the line are broken at the last char that fits. Rows
+    are packed from cached word advances, which ignore kerning and rounding
+    across words, so each finished row is confirmed with font.size and backs
+    off a word at a time if it turns out wider."""
+    if text == "":
+        return [""]
+    max_w = max(1, max_w)
+    words = text.split(" ")
+    rows = []
+    cur = []
+    cur_w = 0
+    i = 0
+    while True:
+        if i < len(words):
+            word = words[i]
+            w = cache.word_width(word) if word else 0
+            add = w if not cur else cache.space_width + w
+            if not cur or cur_w + add <= max_w:
+                if w > max_w:
+                    # palavra maior que a linha: quebra por caractere
+                    while word and cache.word_width(word) > max_w:
+                        n = max(1, cache.fit_chars(word, max_w))
+                        rows.append(word[:n])
+                        word = word[n:]
+                    words[i] = word  # o resto volta inteiro se a linha recuar
+                    w = add = cache.word_width(word) if word else 0
+                cur.append(word)
+                cur_w += add
+                i += 1
+                continue
+        elif not cur:
+            return rows
+        # fecha a linha; palavras que não couberam de fato vão para a próxima
+        row, n = _fit_row(cur, max_w, cache)
+        rows.append(row)
+        i -= len(cur) - n
+        cur, cur_w = [], 0